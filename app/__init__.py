@@ -1,7 +1 @@
-from dotenv import load_dotenv
-
 from .main import create_app
-
-load_dotenv()
-
-app = create_app()
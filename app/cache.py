@@ -0,0 +1,130 @@
+"""Versioned cache for rendered HTMX fragments."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import select
+
+from app.db import get_session
+from app.models import Contact, get_data_version
+from app.view_models import DUE_SOON_WINDOW, load_contact_counts
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of rendered fragment bodies keyed by ETag.
+
+    The dashboard's contact counts are kept here too; see cached_contact_counts().
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key, body):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def init_app(app):
+    app.extensions["fragment_cache"] = FragmentCache(app.config["FRAGMENT_CACHE_SIZE"])
+
+
+def _fragment_etag(version):
+    key = repr(
+        (
+            request.endpoint,
+            sorted(request.view_args.items()),
+            sorted(request.args.items(multi=True)),
+            version,
+        )
+    )
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def cached_fragment(per_contact=False):
+    """Cache a fragment view under the current data version.
+
+    The fragment is keyed on the global data version, or on the version of
+    the ``contact_id`` view argument when ``per_contact`` is set. Responses carry a
+    strong ETag so unchanged fragments are answered with 304 Not Modified.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            contact_id = kwargs.get("contact_id") if per_contact else None
+            version = get_data_version(get_session(), contact_id)
+            etag = _fragment_etag(version)
+
+            if etag in request.if_none_match:
+                response = current_app.response_class(status=304)
+            else:
+                cache = current_app.extensions["fragment_cache"]
+                body = cache.get(etag)
+                if body is not None:
+                    response = current_app.response_class(body, mimetype="text/html")
+                else:
+                    response = make_response(view(**kwargs))
+                    if response.status_code == 200:
+                        cache.set(etag, response.get_data())
+
+            if response.status_code in (200, 304):
+                response.set_etag(etag)
+                # Let clients keep the fragment but revalidate it on every fetch
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _next_due_at(since):
+    due_at = Contact.next_due_at
+    return (
+        select(due_at).where(due_at >= since).order_by(due_at).limit(1)
+    ).scalar_subquery()
+
+
+def cached_contact_counts(session, now):
+    """load_contact_counts(), reused until the counts could have changed.
+
+    Besides writes, which bump the data version, the counts only change when
+    the clock passes a stored due date or brings one into the due-soon
+    window. The first due dates at or after ``now`` and the window's end are
+    part of the key, so an entry goes stale exactly when either is passed.
+    """
+    boundaries = session.execute(
+        select(_next_due_at(now), _next_due_at(now + DUE_SOON_WINDOW))
+    ).one()
+    key = ("contact_counts", get_data_version(session), *boundaries)
+
+    cache = current_app.extensions["fragment_cache"]
+    counts = cache.get(key)
+    if counts is None:
+        counts = load_contact_counts(session, now)
+        cache.set(key, counts)
+    return counts
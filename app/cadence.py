@@ -0,0 +1,86 @@
+"""Cadence statistics: how regularly a contact has actually been kept up with.
+
+Works on one contact's sorted interaction dates and its target period, so it
+can be recomputed for just the contacts whose history changed.
+"""
+
+import math
+import statistics
+from collections import namedtuple
+
+# The trend compares the mean of this many latest gaps with the overall mean
+RECENT_GAPS = 5
+
+# Recent gaps within this fraction of the overall mean count as steady
+TREND_TOLERANCE = 0.1
+
+IMPROVING = "improving"
+STEADY = "steady"
+WORSENING = "worsening"
+
+Cadence = namedtuple(
+    "Cadence",
+    [
+        "gap_count",
+        "mean_gap_days",
+        "median_gap_days",
+        "recent_mean_gap_days",
+        "on_time_count",
+        "current_streak",
+        "longest_streak",
+        "expected_periods",
+        "missed_periods",
+    ],
+)
+
+
+def compute_cadence(dates, period_days):
+    """Compute cadence statistics from a contact's interaction dates.
+
+    ``dates`` must be sorted oldest first. A gap is on time if it is no
+    longer than ``period_days``; a gap spanning several periods counts every
+    period after the first as missed. Returns None with fewer than two dates,
+    or when the period isn't positive and gaps can't be measured against it.
+    """
+    if len(dates) < 2 or period_days <= 0:
+        return None
+
+    gaps = [
+        (later - earlier).total_seconds() / 86400
+        for earlier, later in zip(dates, dates[1:])
+    ]
+
+    on_time = 0
+    streak = 0
+    longest = 0
+    expected = 0
+    for gap in gaps:
+        periods = max(1, math.ceil(gap / period_days))
+        expected += periods
+        if periods == 1:
+            on_time += 1
+            streak += 1
+            longest = max(longest, streak)
+        else:
+            streak = 0
+
+    return Cadence(
+        gap_count=len(gaps),
+        mean_gap_days=statistics.fmean(gaps),
+        median_gap_days=statistics.median(gaps),
+        recent_mean_gap_days=statistics.fmean(gaps[-RECENT_GAPS:]),
+        on_time_count=on_time,
+        current_streak=streak,
+        longest_streak=longest,
+        expected_periods=expected,
+        missed_periods=expected - len(gaps),
+    )
+
+
+def cadence_trend(mean_gap_days, recent_mean_gap_days):
+    """Whether recent gaps are shorter, similar or longer than usual."""
+    if recent_mean_gap_days < mean_gap_days * (1 - TREND_TOLERANCE):
+        return IMPROVING
+    if recent_mean_gap_days > mean_gap_days * (1 + TREND_TOLERANCE):
+        return WORSENING
+    return STEADY
@@ -0,0 +1,146 @@
+"""Engine registry and request-scoped sessions."""
+
+import logging
+import os
+
+from flask import current_app, g
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE = "round_again.db"
+
+# Applied to every new SQLite connection. WAL lets readers and the scheduler's
+# writes proceed concurrently, and busy_timeout makes writers wait for the
+# lock instead of failing with "database is locked". foreign_keys is off by
+# default in SQLite; contact deletes rely on it to cascade.
+DEFAULT_SQLITE_PRAGMAS = {
+    "foreign_keys": "ON",
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "cache_size": -20000,  # negative values are KiB, so ~20MB
+    "mmap_size": 268435456,  # 256MB
+}
+
+# One engine per database per process
+_engines = {}
+
+
+def database_uri(database_url=None):
+    """Normalize a database path or URL into a SQLAlchemy URL.
+
+    Bare paths are treated as SQLite database files, which is how
+    DATABASE_URL has historically been set.
+    """
+    if not database_url:
+        database_url = DEFAULT_DATABASE
+    if "://" not in database_url:
+        database_url = f"sqlite:///{os.path.abspath(database_url)}"
+
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database not in (None, ":memory:"):
+        # Ensure directory exists
+        db_dir = os.path.dirname(os.path.abspath(url.database))
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+    return url.render_as_string(hide_password=False)
+
+
+def _set_sqlite_pragmas(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+def get_engine(
+    database_url=None,
+    pool_size=5,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_recycle=-1,
+    sqlite_pragmas=None,
+):
+    """Return the shared engine for a database, creating it on first use."""
+    uri = database_uri(database_url)
+    engine = _engines.get(uri)
+    if engine is not None:
+        return engine
+
+    logger.info(f"Creating database engine: {uri}")
+    options = {}
+    if not uri.endswith(":memory:"):
+        options.update(
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+        )
+    engine = create_engine(uri, **options)
+
+    if engine.dialect.name == "sqlite":
+        pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+        pragmas.update(sqlite_pragmas or {})
+        event.listen(engine, "connect", _set_sqlite_pragmas(pragmas))
+
+    _engines[uri] = engine
+    return engine
+
+
+def dispose_engines(close=True):
+    """Drop pooled connections for every registered engine.
+
+    In a process just forked from one that had connections open, pass
+    ``close=False``: the connections are then discarded without being closed,
+    since they still belong to the parent.
+    """
+    for engine in _engines.values():
+        engine.dispose(close=close)
+
+
+def engine_options(config):
+    """Build get_engine() keyword arguments from the app config."""
+    return {
+        "pool_size": config["DATABASE_POOL_SIZE"],
+        "max_overflow": config["DATABASE_MAX_OVERFLOW"],
+        "pool_timeout": config["DATABASE_POOL_TIMEOUT"],
+        "pool_recycle": config["DATABASE_POOL_RECYCLE"],
+        "sqlite_pragmas": {
+            "journal_mode": config["SQLITE_JOURNAL_MODE"],
+            "synchronous": config["SQLITE_SYNCHRONOUS"],
+            "busy_timeout": config["SQLITE_BUSY_TIMEOUT"],
+            "cache_size": config["SQLITE_CACHE_SIZE"],
+            "mmap_size": config["SQLITE_MMAP_SIZE"],
+        },
+    }
+
+
+def init_app(app, engine):
+    """Bind the app to an engine and scope sessions to the app context."""
+    app.db_engine = engine
+    app.session_factory = sessionmaker(bind=engine)
+    app.teardown_appcontext(close_session)
+
+
+def get_session():
+    """Return the session for the current request, opening it if needed."""
+    if "db_session" not in g:
+        g.db_session = current_app.session_factory()
+    return g.db_session
+
+
+def close_session(exception=None):
+    session = g.pop("db_session", None)
+    if session is not None:
+        if exception is not None:
+            session.rollback()
+        session.close()
@@ -0,0 +1,81 @@
+"""Batch computation of contact due state.
+
+Evaluates the DAY/WEEK/MONTH(30d)/YEAR(365d) due rules for many contacts in a
+single pass against one shared ``now``, instead of each template access
+recomputing it through the ``Contact`` properties.
+"""
+
+from collections import namedtuple
+
+from app.models import compute_next_due
+
+OVERDUE = "overdue"
+DUE_SOON = "due_soon"
+ON_TRACK = "on_track"
+
+DueState = namedtuple("DueState", ["next_due", "days_until_due", "status"])
+
+
+def due_status(days_until_due):
+    """Classify a contact by the number of days until it is due."""
+    if days_until_due < 0:
+        return OVERDUE
+    if days_until_due <= 1:
+        return DUE_SOON
+    return ON_TRACK
+
+
+class DueBatch:
+    """Due state for a batch of contacts, stored as parallel lists."""
+
+    def __init__(self, contact_ids, next_due, days_until_due, status):
+        self.contact_ids = contact_ids
+        self.next_due = next_due
+        self.days_until_due = days_until_due
+        self.status = status
+
+    def __len__(self):
+        return len(self.contact_ids)
+
+    def by_contact(self):
+        """Map each contact id to its DueState."""
+        return {
+            contact_id: DueState(next_due, days, status)
+            for contact_id, next_due, days, status in zip(
+                self.contact_ids, self.next_due, self.days_until_due, self.status
+            )
+        }
+
+
+def compute_due(rows, now):
+    """Compute due state for many contacts at once.
+
+    ``rows`` is an iterable of (contact_id, frequency_value, frequency_unit,
+    last_interaction_at) tuples. Contacts without interactions are due at
+    ``now``.
+    """
+    contact_ids = []
+    next_due = []
+    days_until_due = []
+    status = []
+
+    for contact_id, frequency_value, frequency_unit, last_interaction_at in rows:
+        due = compute_next_due(last_interaction_at, frequency_value, frequency_unit)
+        if due is None:
+            due = now
+        days = (due - now).days
+
+        contact_ids.append(contact_id)
+        next_due.append(due)
+        days_until_due.append(days)
+        status.append(due_status(days))
+
+    return DueBatch(contact_ids, next_due, days_until_due, status)
+
+
+def due_rows(contacts):
+    """Build compute_due() input rows from Contacts or rows with their columns."""
+    return [
+        (c.id, c.frequency_value, c.frequency_unit, c.last_interaction_at)
+        for c in contacts
+    ]
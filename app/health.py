@@ -0,0 +1,32 @@
+"""Readiness check for load balancers, container health checks and deploys."""
+
+import logging
+
+from flask import current_app, jsonify
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.migrations import unapplied_migrations
+
+logger = logging.getLogger(__name__)
+
+
+def readiness_view():
+    """200 once the database answers and its schema is fully migrated, else 503.
+
+    Runs one read on a pooled connection, so it is cheap enough to poll.
+    """
+    try:
+        with current_app.db_engine.connect() as connection:
+            unapplied = unapplied_migrations(connection)
+    except SQLAlchemyError as e:
+        logger.warning(f"Readiness check failed: {str(e)}")
+        return jsonify(status="unavailable", error="database unavailable"), 503
+
+    if unapplied:
+        return jsonify(status="unavailable", pending_migrations=unapplied), 503
+    return jsonify(status="ready")
+
+
+def init_app(app):
+    """Serve the readiness check at /ready."""
+    app.add_url_rule("/ready", "ready", readiness_view)
@@ -3,9 +3,10 @@ import logging
 import os
 from datetime import datetime
 
-from flask import Flask
+from flask import Flask, has_request_context, url_for
+from jinja2 import FileSystemBytecodeCache
 
-from app.models import Base, init_db
+from app import cache, db, health, metrics
 from app.services.scheduler_service import init_scheduler
 
 
@@ -17,12 +18,51 @@ def create_app(test_config=None):
     app.config.from_mapping(
         SECRET_KEY=os.environ.get("SECRET_KEY", "dev"),
         DATABASE_URL=os.environ.get("DATABASE_URL", "sqlite:///round_again.db"),
+        DATABASE_POOL_SIZE=int(os.environ.get("DATABASE_POOL_SIZE", 5)),
+        DATABASE_MAX_OVERFLOW=int(os.environ.get("DATABASE_MAX_OVERFLOW", 10)),
+        DATABASE_POOL_TIMEOUT=int(os.environ.get("DATABASE_POOL_TIMEOUT", 30)),
+        DATABASE_POOL_RECYCLE=int(os.environ.get("DATABASE_POOL_RECYCLE", -1)),
+        SQLITE_JOURNAL_MODE=os.environ.get("SQLITE_JOURNAL_MODE", "WAL"),
+        SQLITE_SYNCHRONOUS=os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL"),
+        SQLITE_BUSY_TIMEOUT=int(os.environ.get("SQLITE_BUSY_TIMEOUT", 5000)),
+        SQLITE_CACHE_SIZE=int(os.environ.get("SQLITE_CACHE_SIZE", -20000)),
+        SQLITE_MMAP_SIZE=int(os.environ.get("SQLITE_MMAP_SIZE", 268435456)),
         EMAIL_HOST=os.environ.get("EMAIL_HOST", "smtp.example.com"),
         EMAIL_PORT=int(os.environ.get("EMAIL_PORT", 587)),
         EMAIL_USER=os.environ.get("EMAIL_USER", "user@example.com"),
         EMAIL_PASSWORD=os.environ.get("EMAIL_PASSWORD", "password"),
         EMAIL_FROM=os.environ.get("EMAIL_FROM", "noreply@roundagain.app"),
+        EMAIL_USE_TLS=os.environ.get("EMAIL_USE_TLS", "true").lower() == "true",
+        EMAIL_POOL_SIZE=int(os.environ.get("EMAIL_POOL_SIZE", 2)),
+        EMAIL_TIMEOUT=int(os.environ.get("EMAIL_TIMEOUT", 30)),
+        EMAIL_OUTBOX_INTERVAL=int(os.environ.get("EMAIL_OUTBOX_INTERVAL", 30)),
+        EMAIL_OUTBOX_BATCH_SIZE=int(os.environ.get("EMAIL_OUTBOX_BATCH_SIZE", 50)),
+        EMAIL_OUTBOX_MAX_ATTEMPTS=int(os.environ.get("EMAIL_OUTBOX_MAX_ATTEMPTS", 8)),
+        EMAIL_OUTBOX_RETRY_DELAY=int(os.environ.get("EMAIL_OUTBOX_RETRY_DELAY", 60)),
         USER_EMAIL=os.environ.get("USER_EMAIL", "user@example.com"),
+        SCHEDULER_ENABLED=os.environ.get("SCHEDULER_ENABLED", "true").lower() == "true",
+        SCHEDULER_LEASE_TTL=int(os.environ.get("SCHEDULER_LEASE_TTL", 60)),
+        REMINDER_CHUNK_SIZE=int(os.environ.get("REMINDER_CHUNK_SIZE", 500)),
+        FRAGMENT_CACHE_SIZE=int(os.environ.get("FRAGMENT_CACHE_SIZE", 256)),
+        CONTACTS_PAGE_SIZE=int(os.environ.get("CONTACTS_PAGE_SIZE", 50)),
+        CONTACTS_MAX_PAGE_SIZE=int(os.environ.get("CONTACTS_MAX_PAGE_SIZE", 200)),
+        # Interactions older than this many days move to the archive; 0 keeps them
+        INTERACTION_ARCHIVE_DAYS=int(os.environ.get("INTERACTION_ARCHIVE_DAYS", 730)),
+        INTERACTIONS_PAGE_SIZE=int(os.environ.get("INTERACTIONS_PAGE_SIZE", 20)),
+        ARCHIVE_PAGE_SIZE=int(os.environ.get("ARCHIVE_PAGE_SIZE", 20)),
+        STATS_PAGE_SIZE=int(os.environ.get("STATS_PAGE_SIZE", 100)),
+        STATS_MAX_PAGE_SIZE=int(os.environ.get("STATS_MAX_PAGE_SIZE", 1000)),
+        # Defaults to a per-user directory under the system temp dir
+        JINJA_BYTECODE_CACHE_DIR=os.environ.get("JINJA_BYTECODE_CACHE_DIR"),
+        METRICS_ENABLED=os.environ.get("METRICS_ENABLED", "true").lower() == "true",
+        # Log requests slower than this with their SQL; 0 turns the log off
+        SLOW_REQUEST_MS=int(os.environ.get("SLOW_REQUEST_MS", 1000)),
+        SEARCH_RESULT_LIMIT=int(os.environ.get("SEARCH_RESULT_LIMIT", 10)),
+        SEARCH_MAX_RESULTS=int(os.environ.get("SEARCH_MAX_RESULTS", 50)),
+        # Needed for the links in emails sent by the scheduler, which leave
+        # them out without it
+        SERVER_NAME=os.environ.get("SERVER_NAME"),
+        PREFERRED_URL_SCHEME=os.environ.get("PREFERRED_URL_SCHEME", "http"),
     )
 
     # Load test config if passed in
@@ -35,22 +75,44 @@ def create_app(test_config=None):
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     )
 
-    # Initialize database
-    logging.info("Setting up database...")
-    db_engine = init_db(app.config["DATABASE_URL"])
-    app.db_engine = db_engine
-    Base.metadata.create_all(db_engine)
+    # Compiled templates are reused across restarts, so cold renders are cheap
+    app.jinja_options = {
+        **app.jinja_options,
+        "bytecode_cache": FileSystemBytecodeCache(
+            app.config["JINJA_BYTECODE_CACHE_DIR"]
+        ),
+    }
+
+    # Nothing below connects to the database or starts threads, so gunicorn can
+    # build the app once and fork workers from it. The schema is created by
+    # `flask init-db` (or init_db.py), and the serving entry point starts the
+    # scheduler.
+    db_engine = db.get_engine(
+        app.config["DATABASE_URL"], **db.engine_options(app.config)
+    )
+    db.init_app(app, db_engine)
+    metrics.init_app(app)
+    cache.init_app(app)
+    health.init_app(app)
 
     # Initialize scheduler
     scheduler = init_scheduler(app, db_engine)
     app.scheduler = scheduler
 
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create or upgrade the database schema."""
+        from app.models import init_db
+
+        init_db(app.config["DATABASE_URL"], **db.engine_options(app.config))
+
     # Register blueprints
-    from app.routes import contacts, dashboard, interactions
+    from app.routes import contacts, dashboard, export, interactions
 
     app.register_blueprint(dashboard.bp)
     app.register_blueprint(contacts.bp)
     app.register_blueprint(interactions.bp)
+    app.register_blueprint(export.bp)
 
     # Make url_for('index') == url_for('dashboard.index')
     app.add_url_rule("/", endpoint="index")
@@ -68,6 +130,16 @@ def create_app(test_config=None):
         """Jinja filter to get absolute value"""
         return abs(n)
 
+    @app.template_global()
+    def external_url(endpoint, **values):
+        """Absolute URL for an email link, or None when the host isn't known.
+
+        Outside a request only SERVER_NAME gives the host.
+        """
+        if not (app.config["SERVER_NAME"] or has_request_context()):
+            return None
+        return url_for(endpoint, _external=True, **values)
+
     # Add global template context
     @app.context_processor
     def utility_processor():
@@ -0,0 +1,299 @@
+"""In-process metrics exposed in Prometheus text format at /metrics.
+
+Each worker process keeps its own metrics; scrape every worker, or run a
+single one, to see all of them.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import (
+    Response,
+    before_render_template,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Statements kept per request for the slow request log
+MAX_LOGGED_STATEMENTS = 20
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}{labels} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = next(
+            (i for i, bound in enumerate(self.buckets) if value <= bound),
+            len(self.buckets),
+        )
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labelnames, key, [("le", bound)])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Metrics:
+    """The app's metrics, stored in app.extensions["metrics"]."""
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds",
+            "Request latency.",
+            ["endpoint", "method", "status"],
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes",
+            "Response body size, for responses with a known length.",
+            ["endpoint"],
+            SIZE_BUCKETS,
+        )
+        self.request_queries = Histogram(
+            "http_request_sql_queries",
+            "SQL statements executed per request.",
+            ["endpoint"],
+            QUERY_COUNT_BUCKETS,
+        )
+        self.request_sql_duration = Histogram(
+            "http_request_sql_duration_seconds",
+            "Total SQL time per request.",
+            ["endpoint"],
+        )
+        self.template_duration = Histogram(
+            "template_render_duration_seconds",
+            "Jinja template render time.",
+            ["template"],
+        )
+        self.job_duration = Histogram(
+            "scheduler_job_duration_seconds",
+            "Scheduled job run time.",
+            ["job", "outcome"],
+            JOB_BUCKETS,
+        )
+        self.emails = Counter(
+            "emails_sent_total", "Email delivery attempts by outcome.", ["outcome"]
+        )
+
+    def render(self):
+        lines = []
+        for metric in (
+            self.request_duration,
+            self.response_size,
+            self.request_queries,
+            self.request_sql_duration,
+            self.template_duration,
+            self.job_duration,
+            self.emails,
+        ):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def get_metrics():
+    """The current app's metrics, or None outside an app or if disabled."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get("metrics")
+
+
+def record_email(sent):
+    metrics = get_metrics()
+    if metrics is not None:
+        metrics.emails.inc(outcome="sent" if sent else "failed")
+
+
+@contextmanager
+def time_job(app, job):
+    """Record how long a scheduled job takes and whether it raised."""
+    metrics = app.extensions.get("metrics")
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        if metrics is not None:
+            metrics.job_duration.observe(
+                time.perf_counter() - started, job=job, outcome=outcome
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    if not has_request_context() or "metrics_started" not in g:
+        return
+    elapsed = time.perf_counter() - started
+    g.sql_count += 1
+    g.sql_time += elapsed
+    if g.sql_statements is not None:
+        g.sql_statements.append((elapsed, statement))
+
+
+def _on_sql_error(context):
+    # The statement failed, so after_cursor_execute won't pop its start time
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def _before_render_template(sender, template, context, **extra):
+    if has_request_context():
+        g.setdefault("template_started", []).append(time.perf_counter())
+
+
+def _template_rendered(sender, template, context, **extra):
+    if not has_request_context() or not g.get("template_started"):
+        return
+    metrics = sender.extensions["metrics"]
+    metrics.template_duration.observe(
+        time.perf_counter() - g.template_started.pop(),
+        template=template.name or "<string>",
+    )
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+    # Only kept when the slow request log is on
+    g.sql_statements = [] if current_app.config["SLOW_REQUEST_MS"] else None
+
+
+def _record_request(response):
+    if "metrics_started" not in g:
+        return response
+    elapsed = time.perf_counter() - g.metrics_started
+    endpoint = request.endpoint or "unmatched"
+    metrics = current_app.extensions["metrics"]
+
+    metrics.request_duration.observe(
+        elapsed, endpoint=endpoint, method=request.method, status=response.status_code
+    )
+    metrics.request_queries.observe(g.sql_count, endpoint=endpoint)
+    metrics.request_sql_duration.observe(g.sql_time, endpoint=endpoint)
+    if response.content_length is not None:
+        metrics.response_size.observe(response.content_length, endpoint=endpoint)
+
+    threshold = current_app.config["SLOW_REQUEST_MS"]
+    if threshold and elapsed * 1000 >= threshold:
+        _log_slow_request(elapsed, endpoint)
+    return response
+
+
+def _log_slow_request(elapsed, endpoint):
+    slowest = sorted(g.sql_statements, key=lambda item: item[0], reverse=True)
+    lines = [
+        f"Slow request {request.method} {request.full_path.rstrip('?')} ({endpoint}): "
+        f"{elapsed * 1000:.0f}ms, {g.sql_count} queries "
+        f"taking {g.sql_time * 1000:.0f}ms"
+    ]
+    for duration, statement in slowest[:MAX_LOGGED_STATEMENTS]:
+        lines.append(f"  {duration * 1000:.1f}ms {' '.join(statement.split())}")
+    logger.warning("\n".join(lines))
+
+
+def metrics_view():
+    body = current_app.extensions["metrics"].render()
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Record request, SQL and template metrics and serve them at /metrics."""
+    if not app.config["METRICS_ENABLED"]:
+        return
+    app.extensions["metrics"] = Metrics()
+
+    engine = app.db_engine
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _on_sql_error)
+
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+    app.before_request(_start_request)
+    app.after_request(_record_request)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
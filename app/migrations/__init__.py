@@ -0,0 +1,83 @@
+"""Versioned schema migrations.
+
+Each migration is a module in this package with an ``upgrade(connection)``
+function, listed in MIGRATIONS in the order it must run. Applied versions are
+recorded in the schema_migrations table, so each migration runs once per
+database, in its own transaction.
+
+Base.metadata.create_all() still creates tables that are new in this version;
+migrations change the tables an existing database already has. Write them in
+plain SQL rather than against the models, which keep changing after the
+migration is written.
+"""
+
+import importlib
+import logging
+
+from sqlalchemy import insert, select
+
+from app.models import SchemaMigration
+from app.time_utils import curr_time
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = [
+    "v001_baseline",
+    "v002_interaction_indexes",
+    "v003_orphaned_rows",
+    "v004_interaction_summaries",
+    "v005_cascade_deletes",
+    "v006_interaction_ids",
+]
+
+
+def _version(name):
+    return int(name.split("_")[0][1:])
+
+
+def applied_versions(connection):
+    """Versions recorded as applied to the database."""
+    return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+
+def unapplied_migrations(connection):
+    """Names of the migrations the database is missing, in order."""
+    applied = applied_versions(connection)
+    return [name for name in MIGRATIONS if _version(name) not in applied]
+
+
+def pending_migrations(engine):
+    """Names of the migrations not yet applied, in order."""
+    with engine.begin() as connection:
+        SchemaMigration.__table__.create(connection, checkfirst=True)
+        return unapplied_migrations(connection)
+
+
+def _record(connection, name):
+    connection.execute(
+        insert(SchemaMigration).values(
+            version=_version(name), name=name, applied_at=curr_time()
+        )
+    )
+
+
+def migrate(engine):
+    """Apply pending migrations in order and return their names."""
+    applied = []
+    for name in pending_migrations(engine):
+        logger.info(f"Applying migration {name}")
+        module = importlib.import_module(f"{__name__}.{name}")
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            _record(connection, name)
+        applied.append(name)
+    return applied
+
+
+def stamp(engine):
+    """Record every migration as applied, for a database just created whole."""
+    pending = pending_migrations(engine)
+    with engine.begin() as connection:
+        for name in pending:
+            _record(connection, name)
+    return pending
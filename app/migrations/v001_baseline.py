@@ -0,0 +1,31 @@
+"""Columns and indexes that init_db used to add to older databases ad hoc."""
+
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    columns = {
+        row[1] for row in connection.execute(text("PRAGMA table_info(contacts)"))
+    }
+    if "last_interaction_at" not in columns:
+        connection.execute(
+            text("ALTER TABLE contacts ADD COLUMN last_interaction_at DATETIME")
+        )
+    if "next_due_at" not in columns:
+        connection.execute(text("ALTER TABLE contacts ADD COLUMN next_due_at DATETIME"))
+
+    connection.execute(
+        text("CREATE INDEX IF NOT EXISTS ix_contacts_name ON contacts (name)")
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_contacts_next_due_at "
+            "ON contacts (next_due_at)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt "
+            "ON email_outbox (status, next_attempt_at)"
+        )
+    )
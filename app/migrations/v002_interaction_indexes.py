@@ -0,0 +1,25 @@
+"""Index interactions for per-contact history and the recent feed.
+
+The composite index is ascending: SQLite walks it backwards for "newest
+first", and its implicit rowid suffix then also satisfies the ``id DESC``
+tie-break, which a DESC index would need a temp B-tree sort for. It replaces
+the single-column contact_id index, which is a prefix of it.
+"""
+
+from sqlalchemy import text
+
+
+def upgrade(connection):
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_interactions_contact_date "
+            "ON interactions (contact_id, interaction_date)"
+        )
+    )
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_interactions_interaction_date "
+            "ON interactions (interaction_date)"
+        )
+    )
+    connection.execute(text("DROP INDEX IF EXISTS ix_interactions_contact_id"))
@@ -0,0 +1,29 @@
+"""Drop rows whose contact was deleted before foreign keys were enforced.
+
+With foreign keys on, v004 can't store rollups for them and v005's rebuilt
+tables can't hold them, so this runs ahead of both.
+"""
+
+import logging
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+TABLES = [
+    "interactions",
+    "interactions_archive",
+    "interaction_rollups",
+    "contact_stats",
+]
+
+
+def upgrade(connection):
+    for table in TABLES:
+        orphans = connection.execute(
+            text(
+                f"DELETE FROM {table} WHERE contact_id NOT IN (SELECT id FROM contacts)"
+            )
+        ).rowcount
+        if orphans:
+            logger.warning(f"Dropped {orphans} rows of deleted contacts from {table}")
@@ -0,0 +1,170 @@
+"""Build stored due dates, rollups and cadence stats for existing history.
+
+Frozen at this schema version: enums are stored by name, a frequency unit is
+a fixed number of days, and the cadence arithmetic is the one app.cadence
+had when the stats table was added.
+"""
+
+import math
+import statistics
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from sqlalchemy import DateTime, Integer, String, bindparam, text
+
+UNIT_DAYS = {"DAY": 1, "WEEK": 7, "MONTH": 30, "YEAR": 365}
+
+INTERACTION_TYPES = ["CALL", "VIDEO", "EMAIL", "TEXT", "IN_PERSON", "OTHER"]
+
+RECENT_DAYS = 90
+
+RECENT_GAPS = 5
+
+HISTORY = (
+    "SELECT contact_id, interaction_type, interaction_date FROM interactions "
+    "UNION ALL "
+    "SELECT contact_id, interaction_type, interaction_date FROM interactions_archive"
+)
+
+
+def _latest_type(table):
+    return (
+        f"(SELECT interaction_type FROM {table} AS i "
+        "WHERE i.contact_id = history.contact_id "
+        "ORDER BY i.interaction_date DESC, i.id DESC LIMIT 1)"
+    )
+
+
+def _refresh_rollups(connection, now):
+    counts = ", ".join(
+        f"count(CASE WHEN interaction_type = '{name}' THEN 1 END)"
+        for name in INTERACTION_TYPES
+    )
+    count_columns = ", ".join(f"{name.lower()}_count" for name in INTERACTION_TYPES)
+    connection.execute(text("DELETE FROM interaction_rollups"))
+    connection.execute(
+        text(
+            "INSERT INTO interaction_rollups (contact_id, total_count, "
+            f"{count_columns}, first_interaction_at, last_interaction_at, "
+            "last_interaction_type, recent_count) "
+            f"SELECT contact_id, count(*), {counts}, "
+            "min(interaction_date), max(interaction_date), "
+            # Archived interactions are always older than live ones
+            f"coalesce({_latest_type('interactions')}, "
+            f"{_latest_type('interactions_archive')}), "
+            "count(CASE WHEN interaction_date >= :recent_since THEN 1 END) "
+            f"FROM ({HISTORY}) AS history GROUP BY contact_id"
+        ).bindparams(bindparam("recent_since", type_=DateTime)),
+        {"recent_since": now - timedelta(days=RECENT_DAYS)},
+    )
+
+
+def _cadence(dates, period_days):
+    gaps = [
+        (later - earlier).total_seconds() / 86400
+        for earlier, later in zip(dates, dates[1:])
+    ]
+    on_time = streak = longest = expected = 0
+    for gap in gaps:
+        periods = max(1, math.ceil(gap / period_days))
+        expected += periods
+        if periods == 1:
+            on_time += 1
+            streak += 1
+            longest = max(longest, streak)
+        else:
+            streak = 0
+    return {
+        "gap_count": len(gaps),
+        "mean_gap_days": statistics.fmean(gaps),
+        "median_gap_days": statistics.median(gaps),
+        "recent_mean_gap_days": statistics.fmean(gaps[-RECENT_GAPS:]),
+        "on_time_count": on_time,
+        "current_streak": streak,
+        "longest_streak": longest,
+        "expected_periods": expected,
+        "missed_periods": expected - len(gaps),
+    }
+
+
+def _refresh_contact_stats(connection, now):
+    connection.execute(text("DELETE FROM contact_stats"))
+    period_days = {
+        contact_id: UNIT_DAYS[unit] * value
+        for contact_id, value, unit in connection.execute(
+            text("SELECT id, frequency_value, frequency_unit FROM contacts")
+        )
+    }
+    history = connection.execute(
+        text(
+            f"SELECT contact_id, interaction_date FROM ({HISTORY}) "
+            "ORDER BY contact_id, interaction_date"
+        ).columns(contact_id=Integer, interaction_date=DateTime)
+    )
+
+    rows = []
+    for contact_id, group in groupby(history, key=lambda row: row[0]):
+        dates = [row[1] for row in group]
+        if len(dates) < 2 or period_days.get(contact_id, 0) <= 0:
+            continue
+        rows.append(
+            {
+                "contact_id": contact_id,
+                "computed_at": now,
+                **_cadence(dates, period_days[contact_id]),
+            }
+        )
+    if rows:
+        columns = ", ".join(rows[0])
+        values = ", ".join(f":{column}" for column in rows[0])
+        connection.execute(
+            text(f"INSERT INTO contact_stats ({columns}) VALUES ({values})").bindparams(
+                bindparam("computed_at", type_=DateTime)
+            ),
+            rows,
+        )
+
+
+def _refresh_due_dates(connection):
+    contacts = connection.execute(
+        text(
+            "SELECT c.id, c.frequency_value, c.frequency_unit, r.last_interaction_at "
+            "FROM contacts AS c "
+            "LEFT JOIN interaction_rollups AS r ON r.contact_id = c.id"
+        ).columns(
+            id=Integer,
+            frequency_value=Integer,
+            frequency_unit=String,
+            last_interaction_at=DateTime,
+        )
+    ).all()
+    params = [
+        {
+            "contact_id": contact_id,
+            "last_interaction_at": last_at,
+            "next_due_at": (
+                None
+                if last_at is None
+                else last_at + timedelta(days=UNIT_DAYS[unit] * value)
+            ),
+        }
+        for contact_id, value, unit, last_at in contacts
+    ]
+    if params:
+        connection.execute(
+            text(
+                "UPDATE contacts SET last_interaction_at = :last_interaction_at, "
+                "next_due_at = :next_due_at WHERE id = :contact_id"
+            ).bindparams(
+                bindparam("last_interaction_at", type_=DateTime),
+                bindparam("next_due_at", type_=DateTime),
+            ),
+            params,
+        )
+
+
+def upgrade(connection):
+    now = datetime.now()
+    _refresh_rollups(connection, now)
+    _refresh_contact_stats(connection, now)
+    _refresh_due_dates(connection)
@@ -0,0 +1,64 @@
+"""Cascade contact deletes to interactions, the archive, rollups and stats.
+
+SQLite can't alter a foreign key, so each table is rebuilt: created under a
+new name from its current definition with ON DELETE CASCADE added, filled,
+swapped in, and given back its indexes and triggers (the search index
+triggers on interactions among them). Rows whose contact was deleted before
+foreign keys were enforced are dropped, as they would now violate the key.
+"""
+
+import logging
+import re
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+TABLES = [
+    "interactions",
+    "interactions_archive",
+    "interaction_rollups",
+    "contact_stats",
+]
+
+CONTACT_REFERENCE = re.compile(
+    r'REFERENCES\s+"?contacts"?\s*\(\s*"?id"?\s*\)(?!\s+ON\s+DELETE)', re.IGNORECASE
+)
+
+
+def _rebuild(connection, table):
+    schema = connection.execute(
+        text(
+            "SELECT type, sql FROM sqlite_master "
+            "WHERE tbl_name = :table AND sql IS NOT NULL"
+        ),
+        {"table": table},
+    ).all()
+    table_sql = next(sql for kind, sql in schema if kind == "table")
+    new_sql, references = CONTACT_REFERENCE.subn(
+        "REFERENCES contacts (id) ON DELETE CASCADE", table_sql
+    )
+    if not references:
+        return
+
+    orphans = connection.execute(
+        text(f"DELETE FROM {table} WHERE contact_id NOT IN (SELECT id FROM contacts)")
+    ).rowcount
+    if orphans:
+        logger.warning(f"Dropped {orphans} rows of deleted contacts from {table}")
+
+    new_sql = re.sub(
+        rf'^CREATE TABLE\s+"?{table}"?', f"CREATE TABLE {table}_new", new_sql
+    )
+    connection.execute(text(new_sql))
+    connection.execute(text(f"INSERT INTO {table}_new SELECT * FROM {table}"))
+    connection.execute(text(f"DROP TABLE {table}"))
+    connection.execute(text(f"ALTER TABLE {table}_new RENAME TO {table}"))
+    for kind, sql in schema:
+        if kind in ("index", "trigger"):
+            connection.execute(text(sql))
+
+
+def upgrade(connection):
+    for table in TABLES:
+        _rebuild(connection, table)
@@ -0,0 +1,72 @@
+"""Stop reusing interaction ids, so archived interactions can keep theirs.
+
+SQLite hands out the highest id again once its row is deleted or archived,
+unless the table is AUTOINCREMENT. The interactions table is rebuilt as one,
+with its indexes and triggers. The id sequence starts above every live and
+archived id. Archived rows that were given ids clashing with live ones move
+above both.
+"""
+
+import re
+
+from sqlalchemy import text
+
+ID_COLUMN = re.compile(r"\bid INTEGER NOT NULL,")
+
+PRIMARY_KEY = re.compile(r"\s*PRIMARY KEY \(id\),")
+
+
+def _max_id(connection, table):
+    return connection.execute(
+        text(f"SELECT coalesce(max(id), 0) FROM {table}")
+    ).scalar()
+
+
+def upgrade(connection):
+    schema = connection.execute(
+        text(
+            "SELECT type, sql FROM sqlite_master "
+            "WHERE tbl_name = 'interactions' AND sql IS NOT NULL"
+        )
+    ).all()
+    table_sql = next(sql for kind, sql in schema if kind == "table")
+
+    if "AUTOINCREMENT" not in table_sql.upper():
+        new_sql = PRIMARY_KEY.sub(
+            "",
+            ID_COLUMN.sub("id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,", table_sql),
+        )
+        new_sql = re.sub(
+            r'^CREATE TABLE\s+"?interactions"?',
+            "CREATE TABLE interactions_new",
+            new_sql,
+        )
+        connection.execute(text(new_sql))
+        connection.execute(
+            text("INSERT INTO interactions_new SELECT * FROM interactions")
+        )
+        connection.execute(text("DROP TABLE interactions"))
+        connection.execute(text("ALTER TABLE interactions_new RENAME TO interactions"))
+        for kind, sql in schema:
+            if kind in ("index", "trigger"):
+                connection.execute(text(sql))
+
+    offset = max(
+        _max_id(connection, "interactions"), _max_id(connection, "interactions_archive")
+    )
+    connection.execute(
+        text(
+            "UPDATE interactions_archive SET id = id + :offset "
+            "WHERE id IN (SELECT id FROM interactions)"
+        ),
+        {"offset": offset},
+    )
+
+    last_id = max(
+        _max_id(connection, "interactions"), _max_id(connection, "interactions_archive")
+    )
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'interactions'"))
+    connection.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) VALUES ('interactions', :seq)"),
+        {"seq": last_id},
+    )
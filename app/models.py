@@ -1,21 +1,39 @@
 import enum
 import logging
-import os
+import math
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from itertools import groupby
 
 from sqlalchemy import (
     Column,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
-    create_engine,
+    and_,
+    bindparam,
+    case,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    or_,
+    select,
+    union_all,
+    update,
 )
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, deferred, relationship
 
+from app.cadence import Cadence, compute_cadence
+from app.db import get_engine
 from app.time_utils import curr_time
 
 logger = logging.getLogger(__name__)
@@ -31,6 +49,27 @@ class FrequencyUnit(enum.Enum):
     YEAR = "year"
 
 
+# Approximate length of each frequency unit in days
+FREQUENCY_UNIT_DAYS = {
+    FrequencyUnit.DAY: 1,
+    FrequencyUnit.WEEK: 7,
+    FrequencyUnit.MONTH: 30,
+    FrequencyUnit.YEAR: 365,
+}
+
+
+def compute_next_due(last_interaction_at, frequency_value, frequency_unit):
+    """Calculate when a contact is next due given their last interaction.
+
+    Returns None for contacts without interactions, which are always due now.
+    """
+    if last_interaction_at is None:
+        return None
+    return last_interaction_at + timedelta(
+        days=FREQUENCY_UNIT_DAYS[frequency_unit] * frequency_value
+    )
+
+
 class InteractionType(enum.Enum):
     CALL = "call"
     VIDEO = "video"
@@ -44,49 +83,53 @@ class Contact(Base):
     __tablename__ = "contacts"
 
     id = Column(Integer, primary_key=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, index=True)
     email = Column(String(100))
     phone = Column(String(20))
     frequency_value = Column(Integer, nullable=False, default=1)
     frequency_unit = Column(
         Enum(FrequencyUnit), nullable=False, default=FrequencyUnit.MONTH
     )
-    notes = Column(Text)
+    # Free text of any length, loaded only when accessed; views that show it
+    # select it explicitly (see app.view_models)
+    notes = deferred(Column(Text))
     created_at = Column(DateTime, default=curr_time)
     updated_at = Column(DateTime, default=curr_time, onupdate=curr_time)
 
+    # Denormalized from interactions, kept current by refresh_due_dates()
+    last_interaction_at = Column(DateTime)
+    next_due_at = Column(DateTime, index=True)
+
+    # The database cascades contact deletes, so these are never loaded to
+    # delete them one row at a time
     interactions = relationship(
-        "Interaction", back_populates="contact", cascade="all, delete-orphan"
+        "Interaction",
+        back_populates="contact",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    archived_interactions = relationship(
+        "ArchivedInteraction", cascade="all, delete-orphan", passive_deletes=True
+    )
+    rollup = relationship(
+        "InteractionRollup",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    stats = relationship(
+        "ContactStats",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
     @property
     def next_due_date(self):
         """Calculate the next due date for contacting this person."""
-        now = curr_time()
-
-        if not self.interactions:
-            return now
-
-        last_interaction = max(self.interactions, key=lambda i: i.interaction_date)
-
-        # Calculate next due date based on frequency
-        if self.frequency_unit == FrequencyUnit.DAY:
-            return last_interaction.interaction_date + timedelta(
-                days=self.frequency_value
-            )
-        elif self.frequency_unit == FrequencyUnit.WEEK:
-            return last_interaction.interaction_date + timedelta(
-                weeks=self.frequency_value
-            )
-        elif self.frequency_unit == FrequencyUnit.MONTH:
-            # Simple approximation for months (30 days)
-            return last_interaction.interaction_date + timedelta(
-                days=30 * self.frequency_value
-            )
-        elif self.frequency_unit == FrequencyUnit.YEAR:
-            return last_interaction.interaction_date + timedelta(
-                days=365 * self.frequency_value
-            )
+        if self.next_due_at is None:
+            return curr_time()
+        return self.next_due_at
 
     @property
     def is_due_soon(self):
@@ -95,43 +138,754 @@ class Contact(Base):
     @property
     def is_due(self):
         """Check if this contact is due or overdue for interaction."""
-        # Cache the current time for consistent calculations
-        now = curr_time()
         return self.days_until_due < 0
 
     @property
     def days_until_due(self):
         """Calculate days until next interaction is due (negative if overdue)."""
-        # Cache the current time for consistent calculations
-        now = curr_time()
-        delta = self.next_due_date - now
+        if self.next_due_at is None:
+            return 0
+        delta = self.next_due_at - curr_time()
         return delta.days
 
 
 class Interaction(Base):
     __tablename__ = "interactions"
+    # Ids are never reused, so an interaction keeps its id in the archive and
+    # exports can tell rows apart by id alone
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True)
-    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False)
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False
+    )
     interaction_type = Column(Enum(InteractionType), nullable=False)
     interaction_date = Column(DateTime, nullable=False, default=curr_time)
-    notes = Column(Text)
+    notes = deferred(Column(Text))
 
     contact = relationship("Contact", back_populates="interactions")
 
 
-def init_db(db_path="round_again.db"):
-    # Get absolute path
-    abs_path = os.path.abspath(db_path)
-    db_dir = os.path.dirname(abs_path)
+# A contact's history, newest first. Ascending on purpose: SQLite scans it
+# backwards, and its rowid suffix then matches ORDER BY date DESC, id DESC.
+Index(
+    "ix_interactions_contact_date",
+    Interaction.contact_id,
+    Interaction.interaction_date,
+)
+# The recent interactions feed and archive selection
+Index("ix_interactions_interaction_date", Interaction.interaction_date)
+
+
+class ArchivedInteraction(Base):
+    """Interaction older than the archive horizon, moved out of interactions.
+
+    Keeps the hot interactions table small; detail pages page into the
+    archive on demand.
+    """
+
+    __tablename__ = "interactions_archive"
+    __table_args__ = (
+        Index("ix_interactions_archive_contact_date", "contact_id", "interaction_date"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), nullable=False
+    )
+    interaction_type = Column(Enum(InteractionType), nullable=False)
+    interaction_date = Column(DateTime, nullable=False)
+    notes = deferred(Column(Text))
+    archived_at = Column(DateTime, default=curr_time)
+
+
+# Interactions in the last this many days count toward InteractionRollup.recent_count
+ROLLUP_RECENT_DAYS = 90
+
+
+class InteractionRollup(Base):
+    """Per-contact summary of its interaction history, archived rows included.
+
+    Kept current wherever due dates are refreshed: add_to_rollups() folds in
+    new interactions, and refresh_rollups() recomputes a contact's rollup
+    after backdated inserts, edits and deletes. recent_count only decays
+    when refresh_recent_counts() runs.
+    """
+
+    __tablename__ = "interaction_rollups"
+
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True
+    )
+    total_count = Column(Integer, nullable=False, default=0)
+    call_count = Column(Integer, nullable=False, default=0)
+    video_count = Column(Integer, nullable=False, default=0)
+    email_count = Column(Integer, nullable=False, default=0)
+    text_count = Column(Integer, nullable=False, default=0)
+    in_person_count = Column(Integer, nullable=False, default=0)
+    other_count = Column(Integer, nullable=False, default=0)
+    first_interaction_at = Column(DateTime)
+    last_interaction_at = Column(DateTime)
+    last_interaction_type = Column(Enum(InteractionType))
+    recent_count = Column(Integer, nullable=False, default=0)
+
+
+class ContactStats(Base):
+    """How regularly a contact has been kept up with; see app.cadence.
+
+    Kept current by refresh_contact_stats(), which runs wherever due dates
+    are refreshed. Contacts with fewer than two interactions have no row.
+    """
+
+    __tablename__ = "contact_stats"
+
+    contact_id = Column(
+        Integer, ForeignKey("contacts.id", ondelete="CASCADE"), primary_key=True
+    )
+    gap_count = Column(Integer, nullable=False)
+    mean_gap_days = Column(Float, nullable=False)
+    median_gap_days = Column(Float, nullable=False)
+    recent_mean_gap_days = Column(Float, nullable=False)
+    on_time_count = Column(Integer, nullable=False)
+    current_streak = Column(Integer, nullable=False)
+    longest_streak = Column(Integer, nullable=False)
+    expected_periods = Column(Integer, nullable=False)
+    missed_periods = Column(Integer, nullable=False)
+    computed_at = Column(DateTime, nullable=False, default=curr_time)
+
+
+def rollup_count_column(interaction_type):
+    """Name of the InteractionRollup column counting an interaction type."""
+    return f"{interaction_type.value}_count"
+
+
+class OutboxStatus(enum.Enum):
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class EmailOutbox(Base):
+    """Rendered email waiting to be delivered by the outbox worker."""
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    # Enqueueing the same key twice is a no-op, so a message is sent only once
+    idempotency_key = Column(String(200), nullable=False, unique=True)
+    subject = Column(String(255), nullable=False)
+    to_email = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=curr_time)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=curr_time)
+    sent_at = Column(DateTime)
+
+
+class SchedulerLease(Base):
+    """Lease held by the one process allowed to run scheduled jobs."""
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(50), primary_key=True)
+    holder = Column(String(100))
+    expires_at = Column(DateTime, nullable=False)
+
+
+class SchemaMigration(Base):
+    """A migration from app.migrations that has been applied."""
+
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    applied_at = Column(DateTime, nullable=False)
+
+
+class DataVersion(Base):
+    """Change counter used to invalidate cached fragments and ETags."""
+
+    __tablename__ = "data_versions"
+
+    key = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+GLOBAL_VERSION_KEY = "global"
+
+
+def contact_version_key(contact_id):
+    return f"contact:{contact_id}"
+
+
+def get_data_version(session, contact_id=None):
+    """Return a contact's data version, or the global one if no contact given."""
+    if contact_id is None:
+        key = GLOBAL_VERSION_KEY
+    else:
+        key = contact_version_key(contact_id)
+    version = session.query(DataVersion.version).filter_by(key=key).scalar()
+    return version or 0
+
+
+def next_due_in_range(now, start=None, end=None):
+    """SQL filter for contacts whose next due date falls in [start, end).
+
+    Contacts without interactions have no stored due date and are treated as
+    due at ``now``, so they match whenever ``now`` itself is in range.
+    """
+    conditions = []
+    if start is not None:
+        conditions.append(Contact.next_due_at >= start)
+    if end is not None:
+        conditions.append(Contact.next_due_at < end)
+    in_range = and_(Contact.next_due_at.is_not(None), *conditions)
+
+    if (start is None or start <= now) and (end is None or now < end):
+        return or_(Contact.next_due_at.is_(None), in_range)
+    return in_range
+
+
+def latest_interaction_type():
+    """Correlated subquery for the type of a contact's latest interaction.
+
+    Select it alongside Contact to show the last interaction without loading
+    the contact's full interaction history; it is a primary key lookup on the
+    contact's rollup, and the date itself is stored in
+    Contact.last_interaction_at.
+    """
+    return (
+        select(InteractionRollup.last_interaction_type)
+        .where(InteractionRollup.contact_id == Contact.id)
+        .scalar_subquery()
+        .label("last_interaction_type")
+    )
+
+
+# Keep the number of bound parameters per statement well under SQLite's limit
+REFRESH_BATCH_SIZE = 500
+
+
+def _refresh_batches(contact_ids):
+    """Split ids into IN-list sized batches; None means all contacts."""
+    if contact_ids is None:
+        return [None]
+    contact_ids = sorted(set(contact_ids))
+    return [
+        contact_ids[i : i + REFRESH_BATCH_SIZE]
+        for i in range(0, len(contact_ids), REFRESH_BATCH_SIZE)
+    ]
+
 
-    # Ensure directory exists
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir)
+def _latest_type(table, contact_id):
+    return (
+        select(table.c.interaction_type)
+        .where(table.c.contact_id == contact_id)
+        .order_by(table.c.interaction_date.desc(), table.c.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+@lru_cache(maxsize=None)
+def _rollup_query(batched):
+    """Aggregate live and archived interactions per contact.
+
+    Built once, since constructing it costs more than running it for a
+    single contact. Takes :recent_since and, if batched, :contact_ids.
+    """
+    hot = Interaction.__table__
+    archive = ArchivedInteraction.__table__
+    parts = []
+    for table in (hot, archive):
+        part = select(
+            table.c.contact_id, table.c.interaction_type, table.c.interaction_date
+        )
+        if batched:
+            part = part.where(
+                table.c.contact_id.in_(bindparam("contact_ids", expanding=True))
+            )
+        parts.append(part)
+    history = union_all(*parts).subquery()
+
+    # Archived interactions are always older than live ones
+    last_type = func.coalesce(
+        _latest_type(hot, history.c.contact_id),
+        _latest_type(archive, history.c.contact_id),
+        type_=Enum(InteractionType),
+    )
+    recent = history.c.interaction_date >= bindparam("recent_since")
+    return select(
+        history.c.contact_id,
+        func.count().label("total_count"),
+        *(
+            func.count(case((history.c.interaction_type == t, 1))).label(
+                rollup_count_column(t)
+            )
+            for t in InteractionType
+        ),
+        func.min(history.c.interaction_date).label("first_interaction_at"),
+        func.max(history.c.interaction_date).label("last_interaction_at"),
+        last_type.label("last_interaction_type"),
+        func.count(case((recent, 1))).label("recent_count"),
+    ).group_by(history.c.contact_id)
+
+
+def refresh_rollups(connection, contact_ids=None, now=None):
+    """Recompute the interaction rollups of the given contacts, or of all.
+
+    Counts cover both live and archived interactions. Contacts without any
+    interactions have no rollup row. Returns the number of rollups written.
+    """
+    rollups = InteractionRollup.__table__
+    recent_since = (now or curr_time()) - timedelta(days=ROLLUP_RECENT_DAYS)
+
+    written = 0
+    for batch in _refresh_batches(contact_ids):
+        params = {"recent_since": recent_since}
+        delete_rollups = delete(rollups)
+        if batch is not None:
+            params["contact_ids"] = batch
+            delete_rollups = delete_rollups.where(rollups.c.contact_id.in_(batch))
+        connection.execute(delete_rollups)
+
+        query = _rollup_query(batch is not None)
+        rows = [dict(row._mapping) for row in connection.execute(query, params)]
+        if rows:
+            connection.execute(insert(rollups), rows)
+            written += len(rows)
+
+    return written
+
+
+@lru_cache(maxsize=None)
+def _add_to_rollups_statement():
+    """Upsert that folds a contact's new interactions into its rollup."""
+    rollups = InteractionRollup.__table__
+    statement = sqlite_insert(rollups)
+    excluded = statement.excluded
+    summed = ["total_count", "recent_count"]
+    summed.extend(rollup_count_column(t) for t in InteractionType)
+    return statement.on_conflict_do_update(
+        index_elements=[rollups.c.contact_id],
+        set_={
+            **{name: rollups.c[name] + excluded[name] for name in summed},
+            "last_interaction_at": excluded.last_interaction_at,
+            "last_interaction_type": excluded.last_interaction_type,
+        },
+        # A backdated interaction may change which one is latest
+        where=rollups.c.last_interaction_at <= excluded.first_interaction_at,
+    ).returning(rollups.c.contact_id)
+
+
+def add_to_rollups(connection, interactions, now=None):
+    """Update rollups in place for newly inserted interactions.
+
+    ``interactions`` holds (id, contact_id, interaction_type,
+    interaction_date) rows. A contact is skipped if any of its new
+    interactions predates its last one, and needs refresh_rollups() instead.
+    Returns the ids of the contacts whose rollups were updated.
+    """
+    recent_since = (now or curr_time()) - timedelta(days=ROLLUP_RECENT_DAYS)
+
+    rows = []
+    by_contact = sorted(interactions, key=lambda row: (row[1], row[3], row[0]))
+    for contact_id, group in groupby(by_contact, key=lambda row: row[1]):
+        group = list(group)
+        row = {
+            "contact_id": contact_id,
+            "total_count": len(group),
+            **{rollup_count_column(t): 0 for t in InteractionType},
+            "first_interaction_at": group[0][3],
+            # Ties go to the highest id, which a new interaction always has
+            "last_interaction_at": group[-1][3],
+            "last_interaction_type": group[-1][2],
+            "recent_count": sum(date >= recent_since for *_, date in group),
+        }
+        for _, _, interaction_type, _ in group:
+            row[rollup_count_column(interaction_type)] += 1
+        rows.append(row)
+
+    if not rows:
+        return set()
+    return set(connection.execute(_add_to_rollups_statement(), rows).scalars())
+
+
+@lru_cache(maxsize=None)
+def _history_dates_query(batched):
+    """Live and archived interaction dates, grouped by contact, oldest first."""
+    parts = []
+    for table in (Interaction.__table__, ArchivedInteraction.__table__):
+        part = select(table.c.contact_id, table.c.interaction_date)
+        if batched:
+            part = part.where(
+                table.c.contact_id.in_(bindparam("contact_ids", expanding=True))
+            )
+        parts.append(part)
+    history = union_all(*parts).subquery()
+    return select(history.c.contact_id, history.c.interaction_date).order_by(
+        history.c.contact_id, history.c.interaction_date
+    )
+
+
+def contact_cadences(connection, contact_ids=None):
+    """Yield (contact_id, Cadence) for the given contacts, or for all.
+
+    Contacts with fewer than two interactions are skipped.
+    """
+    contacts = Contact.__table__
+    for batch in _refresh_batches(contact_ids):
+        frequency_query = select(
+            contacts.c.id, contacts.c.frequency_value, contacts.c.frequency_unit
+        )
+        params = {}
+        if batch is not None:
+            frequency_query = frequency_query.where(contacts.c.id.in_(batch))
+            params["contact_ids"] = batch
+        period_days = {
+            contact_id: FREQUENCY_UNIT_DAYS[unit] * value
+            for contact_id, value, unit in connection.execute(frequency_query)
+        }
+
+        history = connection.execute(_history_dates_query(batch is not None), params)
+        for contact_id, rows in groupby(history, key=lambda row: row[0]):
+            if contact_id not in period_days:
+                continue
+            dates = [row[1] for row in rows]
+            cadence = compute_cadence(dates, period_days[contact_id])
+            if cadence is not None:
+                yield contact_id, cadence
+
+
+def refresh_contact_stats(connection, contact_ids=None):
+    """Recompute the stored cadence statistics of the given contacts, or of all.
+
+    Only the touched contacts' own histories are read, so a single write
+    costs the same however large the database is. Returns the number of
+    stats rows written.
+    """
+    stats = ContactStats.__table__
+    now = curr_time()
+
+    delete_stats = delete(stats)
+    if contact_ids is not None:
+        delete_stats = delete_stats.where(
+            stats.c.contact_id.in_(bindparam("contact_ids", expanding=True))
+        )
+        for batch in _refresh_batches(contact_ids):
+            connection.execute(delete_stats, {"contact_ids": batch})
+    else:
+        connection.execute(delete_stats)
+
+    written = 0
+    rows = []
+    for contact_id, cadence in contact_cadences(connection, contact_ids):
+        rows.append({"contact_id": contact_id, "computed_at": now, **cadence._asdict()})
+        if len(rows) >= REFRESH_BATCH_SIZE:
+            connection.execute(insert(stats), rows)
+            written += len(rows)
+            rows = []
+    if rows:
+        connection.execute(insert(stats), rows)
+        written += len(rows)
+    return written
+
+
+def check_contact_stats(connection):
+    """Compare stored cadence statistics with a full recomputation.
+
+    Returns the ids of contacts whose stats are missing, stale or orphaned.
+    """
+    stats = ContactStats.__table__
+    fields = Cadence._fields
+    stored = {
+        row.contact_id: tuple(row[1:])
+        for row in connection.execute(
+            select(stats.c.contact_id, *(stats.c[field] for field in fields))
+        )
+    }
+
+    mismatched = []
+    for contact_id, cadence in contact_cadences(connection):
+        values = stored.pop(contact_id, None)
+        if values is None or not all(
+            math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+            for a, b in zip(values, cadence)
+        ):
+            mismatched.append(contact_id)
+    # Whatever is left has stats but shouldn't
+    mismatched.extend(stored)
+    return sorted(mismatched)
+
+
+def refresh_recent_counts(connection, now=None):
+    """Recount interactions in the recent window for rollups that have any.
+
+    Rollups are only refreshed when a contact's interactions change, so run
+    this daily to let old interactions drop out of recent_count. Bumps the
+    data versions of the contacts whose count changed and returns their ids.
+    """
+    rollups = InteractionRollup.__table__
+    hot = Interaction.__table__
+    recent_since = (now or curr_time()) - timedelta(days=ROLLUP_RECENT_DAYS)
+    recent = (
+        select(func.count())
+        .where(
+            hot.c.contact_id == rollups.c.contact_id,
+            hot.c.interaction_date >= recent_since,
+        )
+        .scalar_subquery()
+    )
+    changed = list(
+        connection.execute(
+            update(rollups)
+            .where(rollups.c.recent_count > 0, rollups.c.recent_count != recent)
+            .values(recent_count=recent)
+            .returning(rollups.c.contact_id)
+        ).scalars()
+    )
+    if changed:
+        # Cached history fragments show the count
+        bump_data_versions(connection, changed)
+    return changed
 
-    # Create db connection
-    db_uri = f"sqlite:///{abs_path}"
-    logger.info(f"Initializing database: {db_uri}")
-    engine = create_engine(db_uri)
+
+def refresh_due_dates(connection, contact_ids=None, added=()):
+    """Recompute the stored last interaction and next due dates.
+
+    Refreshes the given contacts, or every contact when ``contact_ids`` is
+    None, along with their interaction rollups and cadence statistics.
+    ``added`` may list interactions just inserted for contacts with no other
+    interaction changes, whose rollups are then updated in place where
+    add_to_rollups() can. Returns the number of contacts updated.
+    """
+    if contact_ids is None:
+        refresh_rollups(connection)
+    else:
+        contact_ids = set(contact_ids)
+        refresh_rollups(connection, contact_ids - add_to_rollups(connection, added))
+    refresh_contact_stats(connection, contact_ids)
+
+    contacts = Contact.__table__
+    rollups = InteractionRollup.__table__
+    query = select(
+        contacts.c.id,
+        contacts.c.frequency_value,
+        contacts.c.frequency_unit,
+        rollups.c.last_interaction_at,
+    ).select_from(contacts.outerjoin(rollups, rollups.c.contact_id == contacts.c.id))
+    batches = _refresh_batches(contact_ids)
+
+    statement = (
+        update(contacts)
+        .where(contacts.c.id == bindparam("contact_id"))
+        .values(
+            last_interaction_at=bindparam("last_interaction_at"),
+            next_due_at=bindparam("next_due_at"),
+            # Don't let the onupdate hook treat this as a user edit
+            updated_at=contacts.c.updated_at,
+        )
+    )
+
+    updated = 0
+    for batch in batches:
+        batch_query = query if batch is None else query.where(contacts.c.id.in_(batch))
+        params = [
+            {
+                "contact_id": contact_id,
+                "last_interaction_at": last_at,
+                "next_due_at": compute_next_due(last_at, value, unit),
+            }
+            for contact_id, value, unit, last_at in connection.execute(batch_query)
+        ]
+        if params:
+            connection.execute(statement, params)
+            updated += len(params)
+
+    return updated
+
+
+def _changed_contact_ids(session):
+    """Collect contacts whose due dates are affected by pending changes.
+
+    Returns them along with (id, contact_id, interaction_type,
+    interaction_date) rows for the new interactions of the contacts that
+    have no other interaction changes, for add_to_rollups().
+    """
+    contact_ids = set()
+    rewritten = set()
+
+    for obj in session.deleted:
+        if isinstance(obj, Interaction) and obj.contact_id is not None:
+            rewritten.add(obj.contact_id)
+
+    for obj in session.dirty:
+        state = inspect(obj)
+        if isinstance(obj, Interaction):
+            if any(
+                state.attrs[attr].history.has_changes()
+                for attr in ("interaction_date", "contact_id")
+            ):
+                # Covers both the old and new contact if it was reassigned
+                history = state.attrs.contact_id.history
+                rewritten.update(cid for cid in history.sum() if cid is not None)
+        elif isinstance(obj, Contact) and obj not in session.deleted:
+            if any(
+                state.attrs[attr].history.has_changes()
+                for attr in ("frequency_value", "frequency_unit")
+            ):
+                contact_ids.add(obj.id)
+
+    added = []
+    for obj in session.new:
+        if isinstance(obj, Interaction) and obj.contact_id is not None:
+            contact_ids.add(obj.contact_id)
+            if obj.contact_id not in rewritten:
+                added.append(
+                    (obj.id, obj.contact_id, obj.interaction_type, obj.interaction_date)
+                )
+
+    contact_ids |= rewritten
+    return contact_ids, added
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_due_dates_after_flush(session, flush_context):
+    contact_ids, added = _changed_contact_ids(session)
+    if contact_ids:
+        refresh_due_dates(session.connection(), contact_ids, added)
+        session.info.setdefault("due_dates_refreshed", set()).update(contact_ids)
+
+
+def bump_data_versions(connection, contact_ids=()):
+    """Increment the global data version and those of the given contacts.
+
+    Call this after writes that bypass the ORM flush, which bumps the
+    versions automatically.
+    """
+    keys = [GLOBAL_VERSION_KEY]
+    keys.extend(contact_version_key(cid) for cid in sorted(set(contact_ids)))
+
+    versions = DataVersion.__table__
+    statement = sqlite_insert(versions).on_conflict_do_update(
+        index_elements=[versions.c.key],
+        set_={"version": versions.c.version + 1},
+    )
+    connection.execute(statement, [{"key": key, "version": 1} for key in keys])
+
+
+def delete_contacts(connection, contact_ids):
+    """Delete contacts with one statement per batch of ids.
+
+    The database cascades each delete to the contact's interactions, archive,
+    rollup and stats, so none of them are read first. Returns the ids of the
+    contacts that existed and were deleted.
+    """
+    contacts = Contact.__table__
+    deleted = []
+    for batch in _refresh_batches(contact_ids):
+        result = connection.execute(
+            delete(contacts).where(contacts.c.id.in_(batch)).returning(contacts.c.id)
+        )
+        deleted.extend(result.scalars())
+    if deleted:
+        bump_data_versions(connection, deleted)
+    return deleted
+
+
+def delete_interactions(connection, interaction_ids):
+    """Delete interactions with one statement per batch of ids.
+
+    Refreshes the due dates, rollups and stats of the contacts they belonged
+    to. Returns the ids of the interactions deleted, mapped to their contacts.
+    """
+    interactions = Interaction.__table__
+    deleted = {}
+    for batch in _refresh_batches(interaction_ids):
+        result = connection.execute(
+            delete(interactions)
+            .where(interactions.c.id.in_(batch))
+            .returning(interactions.c.id, interactions.c.contact_id)
+        )
+        deleted.update(result.all())
+    contact_ids = set(deleted.values())
+    if contact_ids:
+        refresh_due_dates(connection, contact_ids)
+        bump_data_versions(connection, contact_ids)
+    return deleted
+
+
+def _written_contact_ids(session):
+    """Collect contacts that have any pending contact or interaction write."""
+    contact_ids = set()
+    written = list(session.new) + list(session.deleted)
+    written.extend(obj for obj in session.dirty if session.is_modified(obj))
+
+    for obj in written:
+        if isinstance(obj, Contact):
+            contact_ids.add(obj.id)
+        elif isinstance(obj, Interaction):
+            history = inspect(obj).attrs.contact_id.history
+            contact_ids.update(cid for cid in history.sum() if cid is not None)
+
+    return contact_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_data_versions_after_flush(session, flush_context):
+    contact_ids = _written_contact_ids(session)
+    if contact_ids:
+        bump_data_versions(session.connection(), contact_ids)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _expire_refreshed_contacts(session, flush_context):
+    contact_ids = session.info.pop("due_dates_refreshed", None)
+    if not contact_ids:
+        return
+    for obj in session.identity_map.values():
+        if isinstance(obj, Contact) and obj.id in contact_ids:
+            session.expire(obj, ["last_interaction_at", "next_due_at"])
+        elif (
+            isinstance(obj, (InteractionRollup, ContactStats))
+            and obj.contact_id in contact_ids
+        ):
+            session.expire(obj)
+
+
+def backfill_due_dates(engine):
+    """Populate stored due dates for every existing contact."""
+    with engine.begin() as connection:
+        updated = refresh_due_dates(connection)
+    logger.info(f"Backfilled due dates for {updated} contacts")
+    return updated
+
+
+def init_db(db_path="round_again.db", **engine_options):
+    """Return the shared engine for a database, creating or upgrading its schema.
+
+    A new database is created whole from the models; an existing one gets
+    the tables new to this version and then any pending migrations.
+    """
+    engine = get_engine(db_path, **engine_options)
+    logger.info(f"Initializing database: {engine.url}")
+    is_new = not inspect(engine).has_table(Contact.__tablename__)
     Base.metadata.create_all(engine)
+
+    # Imported here since these modules query the models
+    from app.migrations import migrate, stamp
+    from app.search import install_search_index
+
+    if is_new:
+        stamp(engine)
+    else:
+        migrate(engine)
+
+    install_search_index(engine)
     return engine
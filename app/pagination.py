@@ -0,0 +1,40 @@
+"""Opaque cursors for keyset pagination."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page."""
+    payload = json.dumps([_encode_value(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor into its sort key values, validating its shape."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursor(cursor)
+        return [_decode_value(value) for value in values]
+    except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError):
+        raise InvalidCursor(cursor)
@@ -1,60 +1,214 @@
-import os
+import dataclasses
+import io
 from datetime import datetime
 from logging import getLogger
 
-from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.models import Contact, FrequencyUnit, Interaction, InteractionType, init_db
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy.orm import undefer
+
+from app.cadence import RECENT_GAPS
+from app.db import get_session
+from app.models import (
+    Contact,
+    ContactStats,
+    FrequencyUnit,
+    InteractionType,
+    delete_contacts,
+)
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.search import search_contacts
+from app.services.import_service import detect_format, import_contacts
 from app.time_utils import curr_time
+from app.updates import contacts_changed, is_htmx_request
+from app.view_models import (
+    SORT_ORDERS,
+    cadence_query,
+    cadence_summaries,
+    contact_order,
+    contact_page_filter,
+    contact_row_columns,
+    contact_rows,
+    contact_sort_value,
+    load_cadence_summary,
+    load_contact_detail,
+)
 
 # Create a logger
 logger = getLogger(__name__)
 
 bp = Blueprint("contacts", __name__, url_prefix="/contacts")
 
-# Create engine and session factory
-engine = init_db(os.environ.get("DATABASE_URL"))
-Session = sessionmaker(bind=engine)
 
+def _contact_page(session, now, filter_type, sort, cursor=None, page_size=None):
+    """Fetch one page of contacts as ContactRows.
+
+    Returns the rows and the cursor for the next page, or None on the last page.
+    """
+    if page_size is None:
+        page_size = current_app.config["CONTACTS_PAGE_SIZE"]
+
+    after = decode_cursor(cursor, 2) if cursor is not None else None
+    query = session.query(*contact_row_columns())
+    condition = contact_page_filter(filter_type, sort, now, after)
+    if condition is not None:
+        query = query.filter(condition)
+    query = query.order_by(*contact_order(sort))
+
+    # Fetch one extra row to find out whether there is another page
+    rows = query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(contact_sort_value(rows[-1], sort), rows[-1].id)
+
+    return contact_rows(rows, now), next_cursor
+
+
+def _frequency_value():
+    """The submitted frequency value, which must be a positive whole number."""
+    frequency_value = int(request.form.get("frequency_value"))
+    if frequency_value < 1:
+        raise ValueError("Frequency value must be positive")
+    return frequency_value
+
+
+def _render_contact_list(session, filter_type="all", sort="due", cursor=None):
+    # Cached time for consistent calculations
+    now = curr_time()
+
+    page_size = request.args.get(
+        "per_page", current_app.config["CONTACTS_PAGE_SIZE"], type=int
+    )
+    page_size = max(1, min(page_size, current_app.config["CONTACTS_MAX_PAGE_SIZE"]))
 
-@bp.route("/")
-def list_contacts():
-    """List all contacts."""
-    session = Session()
     try:
-        filter_type = request.args.get("filter", "all")
-
-        # Cached time for consistent calculations
-        now = curr_time()
-
-        if filter_type == "due":
-            # Filter for due contacts
-            contacts = [
-                contact
-                for contact in session.query(Contact).all()
-                if contact.is_due_soon
-            ]
-        elif filter_type == "overdue":
-            # Filter for overdue contacts (same as due for now)
-            contacts = [
-                contact for contact in session.query(Contact).all() if contact.is_due
-            ]
-        else:
-            # Show all contacts
-            contacts = session.query(Contact).all()
-
-        # Pass the current time to the template for consistent display
-        return render_template(
-            "contact_list.html",
-            title="All Contacts",
-            contacts=contacts,
+        contacts, next_cursor = _contact_page(
+            session, now, filter_type, sort, cursor, page_size
+        )
+    except InvalidCursor:
+        abort(400, "Invalid cursor")
+
+    next_url = None
+    if next_cursor:
+        next_url = url_for(
+            "contacts.list_contacts",
             filter=filter_type,
-            now=now,
+            sort=sort,
+            cursor=next_cursor,
+            per_page=page_size,
+        )
+
+    # Later pages are appended by the infinite scroll, so only send the rows
+    template = "contact_list.html"
+    if cursor is not None and request.headers.get("HX-Request"):
+        template = "contact_rows.html"
+
+    # Pass the current time to the template for consistent display
+    return render_template(
+        template,
+        title="All Contacts",
+        contacts=contacts,
+        filter=filter_type,
+        sort=sort,
+        next_url=next_url,
+        now=now,
+    )
+
+
+@bp.route("/")
+def list_contacts():
+    """List contacts one page at a time."""
+    session = get_session()
+    filter_type = request.args.get("filter", "all")
+    sort = request.args.get("sort", "due")
+    if sort not in SORT_ORDERS:
+        sort = "due"
+
+    return _render_contact_list(
+        session, filter_type, sort, cursor=request.args.get("cursor")
+    )
+
+
+@bp.route("/search")
+def search():
+    """Typeahead search over contact details and interaction notes."""
+    session = get_session()
+    query = request.args.get("q", "").strip()
+    limit = request.args.get(
+        "limit", current_app.config["SEARCH_RESULT_LIMIT"], type=int
+    )
+    limit = max(1, min(limit, current_app.config["SEARCH_MAX_RESULTS"]))
+
+    return render_template(
+        "contact_search_results.html",
+        query=query,
+        results=search_contacts(session, query, limit),
+    )
+
+
+@bp.route("/<int:contact_id>/stats", methods=["GET"])
+def stats(contact_id):
+    """Cadence statistics fragment for the contact detail page."""
+    session = get_session()
+    return render_template(
+        "contact_stats.html",
+        stats=load_cadence_summary(session, contact_id, curr_time()),
+        recent_gaps=RECENT_GAPS,
+    )
+
+
+@bp.route("/stats", methods=["GET"])
+def bulk_stats():
+    """Cadence statistics as JSON for many contacts.
+
+    Takes repeated ?contact_id=, or pages through every contact with stats
+    using ?after=<contact id> and ?limit=.
+    """
+    session = get_session()
+    query = cadence_query(session).order_by(ContactStats.contact_id)
+    contact_ids = request.args.getlist("contact_id", type=int)
+    limit = request.args.get("limit", current_app.config["STATS_PAGE_SIZE"], type=int)
+    limit = max(1, min(limit, current_app.config["STATS_MAX_PAGE_SIZE"]))
+
+    if contact_ids:
+        query = query.filter(ContactStats.contact_id.in_(contact_ids[:limit]))
+    else:
+        query = query.filter(
+            ContactStats.contact_id > request.args.get("after", 0, type=int)
         )
-    finally:
-        session.close()
+
+    # Fetch one extra row to find out whether there is another page
+    summaries = cadence_summaries(query.limit(limit + 1), curr_time())
+    next_url = None
+    if len(summaries) > limit:
+        summaries = summaries[:limit]
+        if not contact_ids:
+            next_url = url_for(
+                "contacts.bulk_stats", after=summaries[-1].contact_id, limit=limit
+            )
+
+    return jsonify(
+        {
+            "stats": [
+                {
+                    **dataclasses.asdict(summary),
+                    "computed_at": summary.computed_at.isoformat(),
+                }
+                for summary in summaries
+            ],
+            "next": next_url,
+        }
+    )
 
 
 @bp.route("/new", methods=["GET"])
@@ -67,13 +221,13 @@ def new_form():
 @bp.route("/create", methods=["POST"])
 def create():
     """Create a new contact."""
-    session = Session()
+    session = get_session()
     try:
         new_contact = Contact(
             name=request.form.get("name"),
             email=request.form.get("email"),
             phone=request.form.get("phone"),
-            frequency_value=int(request.form.get("frequency_value")),
+            frequency_value=_frequency_value(),
             frequency_unit=FrequencyUnit(request.form.get("frequency_unit")),
             notes=request.form.get("notes"),
         )
@@ -81,68 +235,83 @@ def create():
         session.add(new_contact)
         session.commit()
 
+        if is_htmx_request():
+            return contacts_changed(session, curr_time(), created=[new_contact.id])
         flash("Contact added successfully!", "success")
         return redirect(url_for("contacts.list_contacts"))
     except Exception as e:
         session.rollback()
         flash(f"Error adding contact: {str(e)}", "danger")
         return redirect(url_for("contacts.new_form"))
-    finally:
-        session.close()
+
+
+@bp.route("/import", methods=["GET"])
+def import_form():
+    """Show form to import contacts from a CSV or vCard file."""
+    return render_template("contact_import.html")
+
+
+@bp.route("/import", methods=["POST"])
+def import_file():
+    """Import contacts from an uploaded CSV or vCard file."""
+    upload = request.files.get("file")
+    if not upload or not upload.filename:
+        flash("Choose a file to import.", "danger")
+        return redirect(url_for("contacts.list_contacts"))
+
+    fmt = request.form.get("format") or detect_format(upload.filename)
+    # Read the upload as text without loading it into memory
+    stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+    try:
+        stats = import_contacts(current_app.db_engine, stream, fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        flash(f"Error importing contacts: {str(e)}", "danger")
+        return redirect(url_for("contacts.list_contacts"))
+
+    flash(f"Imported {stats}.", "success" if not stats.error_count else "warning")
+    for line, message in stats.errors[:5]:
+        flash(f"Line {line}: {message}", "warning")
+    return redirect(url_for("contacts.list_contacts"))
 
 
 @bp.route("/<int:contact_id>/detail", methods=["GET"])
 def detail(contact_id):
     """Show contact details."""
-    session = Session()
-    try:
-        # Current time for consistency
-        now = curr_time()
-
-        contact = session.query(Contact).get(contact_id)
-        if not contact:
-            flash("Contact not found!", "danger")
-            return redirect(url_for("contacts.list_contacts"))
+    session = get_session()
+    # Current time for consistency
+    now = curr_time()
 
-        # Get interactions for this contact
-        interactions = (
-            session.query(Interaction)
-            .filter_by(contact_id=contact_id)
-            .order_by(Interaction.interaction_date.desc())
-            .all()
-        )
+    contact = load_contact_detail(session, contact_id, now)
+    if not contact:
+        flash("Contact not found!", "danger")
+        return redirect(url_for("contacts.list_contacts"))
 
-        return render_template(
-            "contact_detail.html", contact=contact, interactions=interactions, now=now
-        )
-    finally:
-        session.close()
+    # The interaction history loads separately, a page at a time
+    return render_template("contact_detail.html", contact=contact, now=now)
 
 
 @bp.route("/<int:contact_id>/edit", methods=["GET"])
 def edit_form(contact_id):
     """Show form to edit a contact."""
-    session = Session()
-    try:
-        contact = session.query(Contact).get(contact_id)
-        if not contact:
-            flash("Contact not found!", "danger")
-            return redirect(url_for("contacts.list_contacts"))
+    session = get_session()
+    contact = load_contact_detail(session, contact_id, curr_time())
+    if not contact:
+        flash("Contact not found!", "danger")
+        return redirect(url_for("contacts.list_contacts"))
 
-        frequency_units = FrequencyUnit.__members__.values()
-        return render_template(
-            "contact_form.html", contact=contact, frequency_units=frequency_units
-        )
-    finally:
-        session.close()
+    frequency_units = FrequencyUnit.__members__.values()
+    return render_template(
+        "contact_form.html", contact=contact, frequency_units=frequency_units
+    )
 
 
 @bp.route("/<int:contact_id>/update", methods=["POST"])
 def update(contact_id):
     """Update a contact."""
-    session = Session()
+    session = get_session()
     try:
-        contact = session.query(Contact).get(contact_id)
+        # Loaded with its notes, so saving them unchanged doesn't rewrite them
+        contact = session.get(Contact, contact_id, options=[undefer(Contact.notes)])
         if not contact:
             flash("Contact not found!", "danger")
             return redirect(url_for("contacts.list_contacts"))
@@ -151,82 +320,93 @@ def update(contact_id):
         contact.name = request.form.get("name")
         contact.email = request.form.get("email")
         contact.phone = request.form.get("phone")
-        contact.frequency_value = int(request.form.get("frequency_value"))
+        contact.frequency_value = _frequency_value()
         contact.frequency_unit = FrequencyUnit(request.form.get("frequency_unit"))
         contact.notes = request.form.get("notes")
 
         session.commit()
+
+        if is_htmx_request():
+            return contacts_changed(session, curr_time(), updated=[contact_id])
         flash("Contact updated successfully!", "success")
         return redirect(url_for("contacts.detail_page", contact_id=contact_id))
     except Exception as e:
         session.rollback()
         flash(f"Error updating contact: {str(e)}", "danger")
         return redirect(url_for("contacts.edit_form", contact_id=contact_id))
-    finally:
-        session.close()
 
 
 @bp.route("/<int:contact_id>/delete", methods=["DELETE"])
 def delete(contact_id):
     """Delete a contact."""
-    session = Session()
+    session = get_session()
     try:
-        contact = session.query(Contact).get(contact_id)
-        if not contact:
+        if not delete_contacts(session.connection(), [contact_id]):
             flash("Contact not found!", "danger")
             return redirect(url_for("contacts.list_contacts"))
-
-        session.delete(contact)
         session.commit()
 
+        if is_htmx_request():
+            return contacts_changed(session, curr_time(), deleted=[contact_id])
         flash("Contact deleted successfully!", "success")
-
-        # For HTMX, return updated contact list
-        contacts = session.query(Contact).all()
-        return render_template("contact_list.html", contacts=contacts, filter="all")
+        return _render_contact_list(session)
     except Exception as e:
         session.rollback()
         flash(f"Error deleting contact: {str(e)}", "danger")
         return redirect(url_for("contacts.detail", contact_id=contact_id))
-    finally:
-        session.close()
+
+
+@bp.route("/delete", methods=["POST"])
+def bulk_delete():
+    """Delete the selected contacts in one transaction."""
+    session = get_session()
+    contact_ids = request.form.getlist("contact_id", type=int)
+    try:
+        deleted = delete_contacts(session.connection(), contact_ids)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        flash(f"Error deleting contacts: {str(e)}", "danger")
+        return redirect(url_for("contacts.list_contacts"))
+
+    if is_htmx_request():
+        return contacts_changed(session, curr_time(), deleted=deleted)
+    if deleted:
+        flash(f"Deleted {len(deleted)} contacts.", "success")
+    else:
+        flash("No contacts selected.", "warning")
+    return redirect(url_for("contacts.list_contacts"))
 
 
 @bp.route("/<int:contact_id>/interactions/new", methods=["GET"])
 def new_interaction_form(contact_id):
     """Show form to add a new interaction."""
-    session = Session()
-    try:
-        contact = session.query(Contact).get(contact_id)
-        if not contact:
-            flash("Contact not found!", "danger")
-            return redirect(url_for("contacts.list_contacts"))
+    session = get_session()
+    contact = session.query(Contact).get(contact_id)
+    if not contact:
+        flash("Contact not found!", "danger")
+        return redirect(url_for("contacts.list_contacts"))
 
-        interaction_types = InteractionType.__members__.values()
-        return render_template(
-            "interaction_form.html",
-            contact=contact,
-            interaction_types=interaction_types,
-        )
-    finally:
-        session.close()
+    interaction_types = InteractionType.__members__.values()
+    return render_template(
+        "interaction_form.html",
+        contact=contact,
+        interaction_types=interaction_types,
+    )
 
 
 @bp.route("/<int:contact_id>", methods=["GET"])
 def detail_page(contact_id):
-    """Show form to add a new interaction."""
-    session = Session()
-    try:
-        contact = session.query(Contact).get(contact_id)
-        if not contact:
-            flash("Contact not found!", "danger")
-            return redirect(url_for("contacts.list_contacts"))
+    """Show a contact's detail page."""
+    session = get_session()
+    contact = load_contact_detail(session, contact_id, curr_time())
+    if not contact:
+        flash("Contact not found!", "danger")
+        return redirect(url_for("contacts.list_contacts"))
 
-        interaction_types = InteractionType.__members__.values()
-        return render_template(
-            "pages/contact_detail_page.html",
-            contact=contact,
-            interaction_types=interaction_types,
-        )
-    finally:
-        session.close()
+    interaction_types = InteractionType.__members__.values()
+    return render_template(
+        "pages/contact_detail_page.html",
+        contact=contact,
+        interaction_types=interaction_types,
+    )
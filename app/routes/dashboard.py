@@ -1,77 +1,43 @@
-import os
-from datetime import datetime, timedelta
+from flask import Blueprint, render_template
 
-from flask import Blueprint, current_app, render_template
-from sqlalchemy import create_engine, desc
-from sqlalchemy.orm import sessionmaker
-
-from app.models import Contact, Interaction, init_db
+from app.cache import cached_contact_counts, cached_fragment
+from app.db import get_session
 from app.time_utils import curr_time
+from app.view_models import load_priority_contacts, load_recent_interactions
 
 bp = Blueprint("dashboard", __name__)
 
-# Create engine and session factory
-engine = init_db(os.environ.get("DATABASE_URL"))
-Session = sessionmaker(bind=engine)
-
 
 @bp.route("/")
 def index():
     """Dashboard homepage showing upcoming contacts."""
-    session = Session()
-    try:
-        # Get all contacts to count totals
-        all_contacts = session.query(Contact).all()
-
-        # Cache the current time for consistent calculations
-        now = curr_time()
+    session = get_session()
+    # Cache the current time for consistent calculations
+    now = curr_time()
 
-        # Count overdue contacts - contacts already due
-        overdue_contacts = [contact for contact in all_contacts if contact.is_due]
+    # Counting every contact is the page's one full index pass
+    counts = cached_contact_counts(session, now)
 
-        # Count contacts due in the next 7 days - not yet due but will be soon
-        due_soon_contacts = [
-            contact
-            for contact in all_contacts
-            if not contact.is_due and contact.next_due_date <= now + timedelta(days=7)
-        ]
+    # Get priority contacts (overdue or due in next 7 days). Not cached: it
+    # reads at most a few rows, and its days until due move with the clock.
+    priority_contacts = load_priority_contacts(session, now)
 
-        # Get priority contacts (overdue or due in next 7 days)
-        priority_contacts = sorted(
-            overdue_contacts + due_soon_contacts, key=lambda x: x.next_due_date
-        )[
-            :5
-        ]  # Top 5 priority contacts
+    # Add current date to context for footer
+    context = {
+        "title": "Dashboard",
+        "counts": counts,
+        "priority_contacts": priority_contacts,
+        "now": now,  # Adding current date for footer
+    }
 
-        # Add current date to context for footer
-        context = {
-            "title": "Dashboard",
-            "overdue_count": len(overdue_contacts),
-            "due_soon_count": len(due_soon_contacts),
-            "total_contacts": len(all_contacts),
-            "priority_contacts": priority_contacts,
-            "now": now,  # Adding current date for footer
-        }
-
-        return render_template("dashboard.html", **context)
-    finally:
-        session.close()
+    return render_template("dashboard.html", **context)
 
 
 @bp.route("/recent", methods=["GET"])
+@cached_fragment()
 def recent_interactions():
-    session = Session()
-
-    try:
-        recent_interactions = (
-            session.query(Interaction)
-            .order_by(desc(Interaction.interaction_date))
-            .limit(5)
-            .all()
-        )
-
-        return render_template(
-            "recent_interactions_card.html", recent_interactions=recent_interactions
-        )
-    finally:
-        session.close()
+    session = get_session()
+    return render_template(
+        "recent_interactions_card.html",
+        recent_interactions=load_recent_interactions(session),
+    )
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from flask import Blueprint, Response, abort, current_app, request
+
+from app.services.export_service import EXPORTS, gzip_chunks
+
+bp = Blueprint("export", __name__, url_prefix="/export")
+
+
+def _date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, f"Invalid {name} date: {value}")
+
+
+def _export_response(kind):
+    """Stream an export, gzip-compressed when ?gzip=1 is given."""
+    export, filename, mimetype = EXPORTS[kind]
+    chunks = export(
+        current_app.db_engine,
+        since=_date_arg("since"),
+        until=_date_arg("until"),
+        contact_ids=request.args.getlist("contact_id", type=int),
+    )
+
+    if request.args.get("gzip", "").lower() in ("1", "true"):
+        chunks = gzip_chunks(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    return Response(
+        chunks,
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@bp.route("/contacts.csv")
+def contacts_csv():
+    """Download contacts as CSV, filtered by update date and contact."""
+    return _export_response("contacts")
+
+
+@bp.route("/interactions.ndjson")
+def interactions_ndjson():
+    """Download interaction history as newline-delimited JSON."""
+    return _export_response("interactions")
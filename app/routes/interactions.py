@@ -1,31 +1,50 @@
-import os
 from datetime import datetime
 
-import flask
-from flask import Blueprint, flash, jsonify, redirect, render_template, request, url_for
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-
-from app.models import Contact, Interaction, InteractionType, init_db
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+from sqlalchemy import exists, tuple_
+
+from app.cache import cached_fragment
+from app.db import get_session
+from app.models import (
+    ROLLUP_RECENT_DAYS,
+    ArchivedInteraction,
+    Contact,
+    Interaction,
+    InteractionType,
+    delete_interactions,
+)
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor
 from app.time_utils import curr_time
+from app.updates import interactions_changed
+from app.view_models import (
+    InteractionRow,
+    archived_interactions_query,
+    interactions_query,
+    interaction_rows,
+    load_interaction_summary,
+)
 
 bp = Blueprint("interactions", __name__, url_prefix="/interactions")
 
-# Create engine and session factory
-engine = init_db(os.environ.get("DATABASE_URL"))
-Session = sessionmaker(bind=engine)
-
 
 @bp.route("/delete/<int:interaction_id>", methods=["DELETE"])
 def delete(interaction_id):
-    session = Session()
+    session = get_session()
     try:
-        interaction = session.query(Interaction).get(interaction_id)
-        if not interaction:
+        deleted = delete_interactions(session.connection(), [interaction_id])
+        if not deleted:
             flash("Interaction not found!", "danger")
             return redirect(url_for("contacts.list_contacts"))
-
-        session.delete(interaction)
         session.commit()
 
         flash("Interaction deleted successfully!", "success")
@@ -34,34 +53,126 @@ def delete(interaction_id):
         session.rollback()
         flash(f"Error deleting contact: {str(e)}", "danger")
         return redirect(url_for("contacts.list_contacts"))
-    finally:
-        session.close()
 
-    return "", 200
+    # The item itself is removed by the swap; update what depends on it
+    return interactions_changed(session, curr_time(), set(deleted.values()))
+
+
+@bp.route("/delete", methods=["POST"])
+def bulk_delete():
+    """Delete the selected interactions in one transaction."""
+    session = get_session()
+    interaction_ids = request.form.getlist("interaction_id", type=int)
+    try:
+        deleted = delete_interactions(session.connection(), interaction_ids)
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        flash(f"Error deleting interactions: {str(e)}", "danger")
+        return redirect(url_for("contacts.list_contacts"))
+
+    if deleted:
+        flash(f"Deleted {len(deleted)} interactions.", "success")
+
+    return interactions_changed(
+        session, curr_time(), set(deleted.values()), deleted=list(deleted)
+    )
+
+
+def _history_page(query, model, page_size):
+    """One page of a newest-first history query, after the request's cursor.
+
+    Returns the rows and the cursor for the next page, or None on the last page.
+    """
+    cursor = request.args.get("cursor")
+    if cursor is not None:
+        try:
+            before_date, before_id = decode_cursor(cursor, 2)
+        except InvalidCursor:
+            abort(400, "Invalid cursor")
+        query = query.filter(
+            tuple_(model.interaction_date, model.id) < tuple_(before_date, before_id)
+        )
+
+    # Fetch one extra row to find out whether there is another page
+    rows = query.limit(page_size + 1).all()
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(rows[-1].interaction_date, rows[-1].id)
 
 
 @bp.route("/all/<int:contact_id>", methods=["GET"])
+@cached_fragment(per_contact=True)
 def get_interactions(contact_id):
-    session = Session()
-    try:
-        contact = session.query(Contact).get(contact_id)
-        interactions = (
-            session.query(Interaction)
-            .filter_by(contact_id=contact_id)
-            .order_by(Interaction.interaction_date.desc())
-            .all()
+    """One page of a contact's live interactions, for the history timeline.
+
+    The first page comes with the summary; after the last, the timeline goes
+    on into the archive.
+    """
+    session = get_session()
+    rows, next_cursor = _history_page(
+        interactions_query(session, contact_id),
+        Interaction,
+        current_app.config["INTERACTIONS_PAGE_SIZE"],
+    )
+
+    archive_url = None
+    if next_cursor is not None:
+        archive_url = url_for(
+            "interactions.get_interactions", contact_id=contact_id, cursor=next_cursor
         )
+    elif session.query(
+        exists().where(ArchivedInteraction.contact_id == contact_id)
+    ).scalar():
+        archive_url = url_for("interactions.archived", contact_id=contact_id)
+
+    if "cursor" in request.args:
+        # Later pages are appended to the timeline, so only send the rows
         return render_template(
-            "interaction_list.html", contact=contact, interactions=interactions
+            "archived_interactions.html",
+            interactions=interaction_rows(rows),
+            archive_url=archive_url,
         )
-    finally:
-        session.close()
+
+    return render_template(
+        "interaction_list.html",
+        contact_id=contact_id,
+        interactions=interaction_rows(rows),
+        summary=load_interaction_summary(session, contact_id),
+        recent_days=ROLLUP_RECENT_DAYS,
+        archive_url=archive_url,
+    )
+
+
+@bp.route("/archive/<int:contact_id>", methods=["GET"])
+@cached_fragment(per_contact=True)
+def archived(contact_id):
+    """One page of a contact's archived interactions, for the history timeline."""
+    session = get_session()
+    rows, next_cursor = _history_page(
+        archived_interactions_query(session, contact_id),
+        ArchivedInteraction,
+        current_app.config["ARCHIVE_PAGE_SIZE"],
+    )
+
+    archive_url = None
+    if next_cursor is not None:
+        archive_url = url_for(
+            "interactions.archived", contact_id=contact_id, cursor=next_cursor
+        )
+
+    return render_template(
+        "archived_interactions.html",
+        interactions=interaction_rows(rows, archived=True),
+        archive_url=archive_url,
+    )
 
 
 @bp.route("/add/<int:contact_id>", methods=["GET", "POST"])
 def add_interaction(contact_id):
     """Add a new interaction for a contact."""
-    session = Session()
+    session = get_session()
     try:
         # Current time for consistency
         now = curr_time()
@@ -80,13 +191,20 @@ def add_interaction(contact_id):
             )
 
             session.add(interaction)
+            # Flushed for its id, so nothing is reloaded after the commit
+            session.flush()
+            added = InteractionRow(
+                id=interaction.id,
+                contact_id=contact_id,
+                interaction_type=interaction.interaction_type,
+                interaction_date=interaction.interaction_date,
+                notes=interaction.notes,
+            )
             session.commit()
 
             flash("Interaction logged successfully!", "success")
 
-            response = flask.Response("")
-            response.headers["HX-Trigger"] = "interactions"
-            return response
+            return interactions_changed(session, now, {contact_id}, added=added)
 
         # Get contact for form
         contact = session.query(Contact).get(contact_id)
@@ -105,29 +223,24 @@ def add_interaction(contact_id):
         session.rollback()
         flash(f"Error logging interaction: {str(e)}", "danger")
         return redirect(url_for("contacts.detail", contact_id=contact_id))
-    finally:
-        session.close()
 
 
 @bp.route("/new/<int:contact_id>", methods=["GET"])
 def new_form(contact_id):
     """Show form to add a new interaction."""
-    session = Session()
-    try:
-        # Current time for consistency
-        now = curr_time()
+    session = get_session()
+    # Current time for consistency
+    now = curr_time()
 
-        contact = session.query(Contact).get(contact_id)
-        if not contact:
-            flash("Contact not found!", "danger")
-            return redirect(url_for("contacts.list_contacts"))
+    contact = session.query(Contact).get(contact_id)
+    if not contact:
+        flash("Contact not found!", "danger")
+        return redirect(url_for("contacts.list_contacts"))
 
-        return render_template(
-            "interaction_form.html",
-            title="Log Interaction",
-            contact=contact,
-            interaction_types=InteractionType.__members__.values(),
-            now=now,
-        )
-    finally:
-        session.close()
+    return render_template(
+        "interaction_form.html",
+        title="Log Interaction",
+        contact=contact,
+        interaction_types=InteractionType.__members__.values(),
+        now=now,
+    )
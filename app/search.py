@@ -0,0 +1,185 @@
+import logging
+import re
+
+from sqlalchemy import text
+
+from app.models import Contact
+
+logger = logging.getLogger(__name__)
+
+# External-content FTS5 tables: the text lives in contacts and interactions,
+# the index is kept in sync by the triggers below.
+SEARCH_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+        name, email, phone, notes,
+        content='contacts', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS interactions_fts USING fts5(
+        notes,
+        content='interactions', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+        INSERT INTO contacts_fts(rowid, name, email, phone, notes)
+        VALUES (new.id, new.name, new.email, new.phone, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, email, phone, notes)
+        VALUES ('delete', old.id, old.name, old.email, old.phone, old.notes);
+    END
+    """,
+    # Only text columns, so due date refreshes don't touch the index
+    """
+    CREATE TRIGGER IF NOT EXISTS contacts_fts_update
+    AFTER UPDATE OF name, email, phone, notes ON contacts BEGIN
+        INSERT INTO contacts_fts(contacts_fts, rowid, name, email, phone, notes)
+        VALUES ('delete', old.id, old.name, old.email, old.phone, old.notes);
+        INSERT INTO contacts_fts(rowid, name, email, phone, notes)
+        VALUES (new.id, new.name, new.email, new.phone, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS interactions_fts_insert
+    AFTER INSERT ON interactions BEGIN
+        INSERT INTO interactions_fts(rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS interactions_fts_delete
+    AFTER DELETE ON interactions BEGIN
+        INSERT INTO interactions_fts(interactions_fts, rowid, notes)
+        VALUES ('delete', old.id, old.notes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS interactions_fts_update
+    AFTER UPDATE OF notes ON interactions BEGIN
+        INSERT INTO interactions_fts(interactions_fts, rowid, notes)
+        VALUES ('delete', old.id, old.notes);
+        INSERT INTO interactions_fts(rowid, notes) VALUES (new.id, new.notes);
+    END
+    """,
+    # Rank name matches above email/phone, and those above notes
+    "INSERT INTO contacts_fts(contacts_fts, rank) VALUES ('rank', 'bm25(10.0, 5.0, 5.0, 1.0)')",
+]
+
+SEARCH_TABLES = ("contacts_fts", "interactions_fts")
+
+# Prefix queries shorter than this match too much to be useful
+MIN_TOKEN_LENGTH = 2
+
+# Matches scored per query; bm25 over every match of a common word is too slow
+RANKED_CANDIDATES = 200
+
+
+def _search_tables_exist(connection):
+    rows = connection.execute(
+        text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (:a, :b)"
+        ),
+        {"a": SEARCH_TABLES[0], "b": SEARCH_TABLES[1]},
+    )
+    return len(rows.all()) == len(SEARCH_TABLES)
+
+
+def install_search_index(engine):
+    """Create the search tables and triggers, filling them if they are new.
+
+    Returns True if the index had to be built.
+    """
+    with engine.begin() as connection:
+        if _search_tables_exist(connection):
+            return False
+        logger.info("Creating full-text search index")
+        for statement in SEARCH_SCHEMA:
+            connection.execute(text(statement))
+        _rebuild(connection)
+    return True
+
+
+def _rebuild(connection):
+    for table in SEARCH_TABLES:
+        connection.execute(text(f"INSERT INTO {table}({table}) VALUES ('rebuild')"))
+
+
+def rebuild_search_index(engine):
+    """Reindex every contact and interaction from scratch."""
+    with engine.begin() as connection:
+        for statement in SEARCH_SCHEMA:
+            connection.execute(text(statement))
+        _rebuild(connection)
+        for table in SEARCH_TABLES:
+            connection.execute(
+                text(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+            )
+    logger.info("Rebuilt full-text search index")
+
+
+def fts_query(query):
+    """Turn typeahead input into an FTS5 query.
+
+    Every word must match; the last one is still being typed so it matches as
+    a prefix. Returns None if there is nothing worth searching for.
+    """
+    tokens = re.findall(r"\w+", query or "")
+    if not tokens or len(tokens[-1]) < MIN_TOKEN_LENGTH:
+        return None
+    # Quote each token so FTS5 operators in the input are taken literally
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_contacts(session, query, limit=10):
+    """Find contacts whose details or interaction notes match a query.
+
+    Contacts matching on their own fields come first, then contacts matched
+    only through interaction notes. Each is ranked by bm25 among its first
+    RANKED_CANDIDATES matches, which keeps very common words from ranking the
+    whole table.
+    """
+    match = fts_query(query)
+    if match is None:
+        return []
+
+    contact_ids = list(
+        session.execute(
+            text(
+                "SELECT rowid FROM ("
+                "  SELECT rowid, rank FROM contacts_fts"
+                "  WHERE contacts_fts MATCH :match LIMIT :candidates"
+                ") ORDER BY rank LIMIT :limit"
+            ),
+            {"match": match, "candidates": RANKED_CANDIDATES, "limit": limit},
+        ).scalars()
+    )
+
+    if len(contact_ids) < limit:
+        note_matches = session.execute(
+            text(
+                "SELECT i.contact_id FROM ("
+                "  SELECT rowid, rank FROM interactions_fts"
+                "  WHERE interactions_fts MATCH :match LIMIT :candidates"
+                ") AS f JOIN interactions AS i ON i.id = f.rowid ORDER BY f.rank"
+            ),
+            {"match": match, "candidates": RANKED_CANDIDATES},
+        ).scalars()
+        for contact_id in note_matches:
+            if contact_id not in contact_ids:
+                contact_ids.append(contact_id)
+                if len(contact_ids) == limit:
+                    break
+
+    if not contact_ids:
+        return []
+    contacts = session.query(Contact).filter(Contact.id.in_(contact_ids)).all()
+    by_id = {contact.id: contact for contact in contacts}
+    return [by_id[cid] for cid in contact_ids if cid in by_id]
@@ -0,0 +1,96 @@
+import logging
+from datetime import timedelta
+
+from sqlalchemy import delete, insert, select, tuple_
+
+from app.models import (
+    ROLLUP_RECENT_DAYS,
+    ArchivedInteraction,
+    Interaction,
+    bump_data_versions,
+    refresh_recent_counts,
+)
+from app.time_utils import curr_time
+
+logger = logging.getLogger(__name__)
+
+# Interactions moved per transaction, so writers are never blocked for long
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_interactions(engine, horizon_days, batch_size=ARCHIVE_BATCH_SIZE, now=None):
+    """Move interactions older than ``horizon_days`` into the archive table.
+
+    Interactions keep their ids. Rollups and stored due dates already account
+    for archived interactions, so only the moved rows change. Returns the
+    number of interactions moved.
+    """
+    if horizon_days < ROLLUP_RECENT_DAYS:
+        # Recent rollup counts are only recomputed from live interactions
+        raise ValueError(f"Archive horizon must be at least {ROLLUP_RECENT_DAYS} days")
+
+    now = now or curr_time()
+    cutoff = now - timedelta(days=horizon_days)
+    hot = Interaction.__table__
+    archive = ArchivedInteraction.__table__
+    query = (
+        select(
+            hot.c.id,
+            hot.c.contact_id,
+            hot.c.interaction_type,
+            hot.c.interaction_date,
+            hot.c.notes,
+        )
+        .where(hot.c.interaction_date < cutoff)
+        .order_by(hot.c.interaction_date, hot.c.id)
+        .limit(batch_size)
+    )
+
+    moved = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(query).all()
+            if not rows:
+                break
+            connection.execute(
+                insert(archive),
+                [
+                    {
+                        # Keeps its id, which no new interaction will reuse
+                        "id": row.id,
+                        "contact_id": row.contact_id,
+                        "interaction_type": row.interaction_type,
+                        "interaction_date": row.interaction_date,
+                        "notes": row.notes,
+                        "archived_at": now,
+                    }
+                    for row in rows
+                ],
+            )
+            # Exactly the rows selected above, as a range of the date index
+            last = rows[-1]
+            connection.execute(
+                delete(hot).where(
+                    tuple_(hot.c.interaction_date, hot.c.id)
+                    <= (last.interaction_date, last.id)
+                )
+            )
+            bump_data_versions(connection, {row.contact_id for row in rows})
+        moved += len(rows)
+
+    logger.info(f"Archived {moved} interactions older than {cutoff:%Y-%m-%d}")
+    return moved
+
+
+def archive_history(engine, horizon_days, now=None):
+    """Archive cold interactions and age the recent rollup counts.
+
+    A horizon of 0 disables archiving but still ages the counts. Returns the
+    number of interactions archived.
+    """
+    moved = 0
+    if horizon_days:
+        moved = archive_interactions(engine, horizon_days, now=now)
+    with engine.begin() as connection:
+        refresh_recent_counts(connection, now)
+    return moved
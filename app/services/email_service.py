@@ -1,63 +1,97 @@
+import atexit
 import logging
-import smtplib
+import threading
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 
 from flask import current_app, render_template
 
+from app.metrics import record_email
 from app.time_utils import curr_time
 
 logger = logging.getLogger(__name__)
 
+_pool_lock = threading.Lock()
+
+
+def get_pool(app):
+    """Return the app's SMTP connection pool, creating it on first use."""
+    pool = app.extensions.get("smtp_pool")
+    if pool is not None:
+        return pool
+
+    with _pool_lock:
+        if "smtp_pool" not in app.extensions:
+            from .smtp_pool import SMTPConnectionPool
+
+            pool = SMTPConnectionPool(
+                app.config["EMAIL_HOST"],
+                app.config["EMAIL_PORT"],
+                user=app.config["EMAIL_USER"],
+                password=app.config["EMAIL_PASSWORD"],
+                use_tls=app.config["EMAIL_USE_TLS"],
+                size=app.config["EMAIL_POOL_SIZE"],
+                timeout=app.config["EMAIL_TIMEOUT"],
+            )
+            app.extensions["smtp_pool"] = pool
+            atexit.register(pool.close)
+        return app.extensions["smtp_pool"]
+
+
+def build_message(subject, to_email, html_content):
+    """Build an HTML email from the configured sender."""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = current_app.config["EMAIL_FROM"]
+    msg["To"] = to_email
+
+    # Add HTML content
+    msg.attach(MIMEText(html_content, "html"))
+    return msg
+
+
+def send_bulk(messages):
+    """Send (subject, to_email, html_content) messages over pooled connections.
+
+    Returns a SendResult per message, in order.
+    """
+    pool = get_pool(current_app._get_current_object())
+    results = pool.send_bulk(
+        build_message(subject, to_email, html_content)
+        for subject, to_email, html_content in messages
+    )
+
+    for result in results:
+        record_email(result.sent)
+        if result.sent:
+            logger.info(f"Email sent to {result.to_email}")
+        else:
+            logger.error(f"Failed to send email to {result.to_email}: {result.error}")
+    return results
+
 
 def send_email(subject, to_email, html_content):
     """Send an email using the configured SMTP settings."""
-    try:
-        # Get email configuration from app config
-        email_host = current_app.config["EMAIL_HOST"]
-        email_port = current_app.config["EMAIL_PORT"]
-        email_user = current_app.config["EMAIL_USER"]
-        email_password = current_app.config["EMAIL_PASSWORD"]
-        email_from = current_app.config["EMAIL_FROM"]
-
-        # Create message
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = email_from
-        msg["To"] = to_email
-
-        # Add HTML content
-        msg.attach(MIMEText(html_content, "html"))
-
-        # Connect to SMTP server and send email
-        with smtplib.SMTP(email_host, email_port) as server:
-            server.starttls()
-            server.login(email_user, email_password)
-            server.send_message(msg)
-
-        logger.info(f"Email sent to {to_email}")
-        return True
-
-    except Exception as e:
-        logger.error(f"Failed to send email: {str(e)}")
-        return False
-
-
-def send_reminder_email(due_contacts):
-    """Send a reminder email with a list of contacts due for communication."""
+    return send_bulk([(subject, to_email, html_content)])[0].sent
+
+
+def render_reminder_email(digests):
+    """Render the reminder email for a list of contacts due for communication.
+
+    Takes ContactDetail view models, already sorted most overdue first, and
+    returns the subject, recipient and HTML content.
+    """
     user_email = current_app.config["USER_EMAIL"]
     subject = "Keep In Touch - Your Contact Reminders"
 
-    # Sort contacts by due date (most overdue first)
-    sorted_contacts = sorted(due_contacts, key=lambda c: c.days_until_due)
-
     # Prepare email content
     html_content = render_template(
-        "emails/daily_reminder.html", contacts=sorted_contacts, today=curr_time().date()
+        "emails/daily_reminder.html", contacts=digests, today=curr_time().date()
     )
 
-    return send_email(subject, user_email, html_content)
+    return subject, user_email, html_content
 
 
 def send_test_email(to_email):
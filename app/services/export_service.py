@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+import logging
+import zlib
+
+from sqlalchemy import literal, literal_column, select, union_all
+
+from app.models import ArchivedInteraction, Contact, Interaction
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the database cursor at a time
+EXPORT_YIELD_PER = 1000
+
+# Buffer this much output before handing a chunk to the response
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+CONTACT_FIELDS = [
+    "id",
+    "name",
+    "email",
+    "phone",
+    "frequency_value",
+    "frequency_unit",
+    "notes",
+    "created_at",
+    "updated_at",
+    "last_interaction_at",
+    "next_due_at",
+]
+
+# Read from both interactions and interactions_archive
+INTERACTION_COLUMNS = [
+    "id",
+    "contact_id",
+    "interaction_type",
+    "interaction_date",
+    "notes",
+]
+
+INTERACTION_FIELDS = INTERACTION_COLUMNS + ["archived"]
+
+
+def _export_value(value):
+    """Convert a column value to its plain exported form."""
+    if value is None:
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def _stream_rows(engine, query):
+    """Yield rows from a server-side cursor, holding one batch in memory."""
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_YIELD_PER).execute(query)
+        for row in result:
+            yield row
+
+
+def contacts_query(since=None, until=None, contact_ids=None):
+    """Contacts changed in [since, until), optionally limited to some ids."""
+    contacts = Contact.__table__
+    query = select(*(contacts.c[field] for field in CONTACT_FIELDS))
+    if since is not None:
+        query = query.where(contacts.c.updated_at >= since)
+    if until is not None:
+        query = query.where(contacts.c.updated_at < until)
+    if contact_ids:
+        query = query.where(contacts.c.id.in_(contact_ids))
+    return query.order_by(contacts.c.id)
+
+
+def _interactions_select(table, archived, since, until, contact_ids):
+    columns = [table.c[field] for field in INTERACTION_COLUMNS]
+    query = select(*columns, literal(archived).label("archived"))
+    if since is not None:
+        query = query.where(table.c.interaction_date >= since)
+    if until is not None:
+        query = query.where(table.c.interaction_date < until)
+    if contact_ids:
+        query = query.where(table.c.contact_id.in_(contact_ids))
+    return query
+
+
+def interactions_query(since=None, until=None, contact_ids=None):
+    """Interactions dated in [since, until), optionally for some contacts.
+
+    Archived interactions are included and flagged. An interaction keeps its
+    id when archived, so ids are unique across both tables. Ordering by id
+    merges two rowid scans instead of sorting the whole export.
+    """
+    query = union_all(
+        _interactions_select(
+            ArchivedInteraction.__table__, True, since, until, contact_ids
+        ),
+        _interactions_select(Interaction.__table__, False, since, until, contact_ids),
+    )
+    return query.order_by(literal_column("id"))
+
+
+def export_contacts_csv(engine, **filters):
+    """Yield the matching contacts as chunks of CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CONTACT_FIELDS)
+
+    count = 0
+    for row in _stream_rows(engine, contacts_query(**filters)):
+        writer.writerow(
+            ["" if value is None else _export_value(value) for value in row]
+        )
+        count += 1
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+    logger.info(f"Exported {count} contacts")
+
+
+def export_interactions_ndjson(engine, **filters):
+    """Yield the matching interactions as chunks of newline-delimited JSON."""
+    lines = []
+    size = 0
+    count = 0
+    for row in _stream_rows(engine, interactions_query(**filters)):
+        line = json.dumps(
+            {field: _export_value(row[i]) for i, field in enumerate(INTERACTION_FIELDS)}
+        )
+        lines.append(line)
+        size += len(line) + 1
+        count += 1
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+            size = 0
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+    logger.info(f"Exported {count} interactions")
+
+
+def gzip_chunks(chunks):
+    """Gzip-compress a stream of text chunks without buffering all of it."""
+    # wbits=31 selects the gzip container
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+EXPORTS = {
+    "contacts": (export_contacts_csv, "contacts.csv", "text/csv"),
+    "interactions": (
+        export_interactions_ndjson,
+        "interactions.ndjson",
+        "application/x-ndjson",
+    ),
+}
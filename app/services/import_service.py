@@ -0,0 +1,399 @@
+import csv
+import logging
+import re
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from app.models import (
+    Contact,
+    FrequencyUnit,
+    Interaction,
+    InteractionType,
+    bump_data_versions,
+    refresh_due_dates,
+)
+from app.time_utils import curr_time
+
+logger = logging.getLogger(__name__)
+
+# Rows inserted per transaction
+IMPORT_BATCH_SIZE = 1000
+
+# Keep at most this many row errors in the import summary
+MAX_REPORTED_ERRORS = 100
+
+ImportRow = namedtuple(
+    "ImportRow",
+    [
+        "line",
+        "name",
+        "email",
+        "phone",
+        "frequency_value",
+        "frequency_unit",
+        "notes",
+        "interaction_date",
+        "interaction_type",
+        "interaction_notes",
+    ],
+)
+
+
+class InvalidRow(ValueError):
+    """Raised for rows that cannot be imported."""
+
+
+class ImportStats:
+    """Running totals reported while an import progresses."""
+
+    def __init__(self):
+        self.rows = 0
+        self.contacts_created = 0
+        self.contacts_matched = 0
+        self.interactions_created = 0
+        self.errors = []
+        self.error_count = 0
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows: {self.contacts_created} contacts created, "
+            f"{self.contacts_matched} matched existing, "
+            f"{self.interactions_created} interactions, {self.error_count} errors"
+        )
+
+
+def normalize_email(email):
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def normalize_phone(phone):
+    """Reduce a phone number to its digits, keeping a leading +."""
+    phone = (phone or "").strip()
+    digits = re.sub(r"\D", "", phone)
+    if not digits:
+        return None
+    return f"+{digits}" if phone.startswith("+") else digits
+
+
+def dedupe_keys(email, phone):
+    """Keys under which a contact is considered the same person."""
+    keys = []
+    email = normalize_email(email)
+    if email:
+        keys.append(("email", email))
+    phone = normalize_phone(phone)
+    if phone:
+        keys.append(("phone", phone))
+    return keys
+
+
+def _parse_datetime(value):
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise InvalidRow(f"Invalid date: {value}")
+    # Stored dates are naive local times, like curr_time()
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _parse_enum(enum_cls, value, default):
+    value = (value or "").strip().lower().replace(" ", "_").replace("-", "_")
+    if not value:
+        return default
+    # Accept plurals like "weeks"
+    for candidate in (value, value.rstrip("s")):
+        try:
+            return enum_cls(candidate)
+        except ValueError:
+            pass
+    raise InvalidRow(f"Invalid {enum_cls.__name__}: {value}")
+
+
+def validate_row(line, fields):
+    """Build an ImportRow from raw field values, raising InvalidRow if invalid."""
+    fields = {key: (value or "").strip() for key, value in fields.items() if key}
+
+    name = fields.get("name")
+    if not name:
+        raise InvalidRow("Missing name")
+    if len(name) > 100:
+        raise InvalidRow("Name is longer than 100 characters")
+
+    email = fields.get("email") or None
+    if email and "@" not in email:
+        raise InvalidRow(f"Invalid email: {email}")
+    phone = fields.get("phone") or None
+
+    frequency_value = fields.get("frequency_value") or "1"
+    try:
+        frequency_value = int(frequency_value)
+    except ValueError:
+        raise InvalidRow(f"Invalid frequency value: {frequency_value}")
+    if frequency_value < 1:
+        raise InvalidRow("Frequency value must be positive")
+
+    interaction_date = _parse_datetime(fields.get("interaction_date"))
+    interaction_type = fields.get("interaction_type")
+    if interaction_date is None and interaction_type:
+        raise InvalidRow("Interaction type given without an interaction date")
+
+    return ImportRow(
+        line=line,
+        name=name,
+        email=email[:100] if email else None,
+        phone=phone[:20] if phone else None,
+        frequency_value=frequency_value,
+        frequency_unit=_parse_enum(
+            FrequencyUnit, fields.get("frequency_unit"), FrequencyUnit.MONTH
+        ),
+        notes=fields.get("notes") or None,
+        interaction_date=interaction_date,
+        interaction_type=_parse_enum(
+            InteractionType, interaction_type, InteractionType.OTHER
+        ),
+        interaction_notes=fields.get("interaction_notes") or None,
+    )
+
+
+def iter_csv_rows(stream):
+    """Yield (line, fields) for each record of a CSV file with a header row.
+
+    Headers are matched case-insensitively, so "Email" and "email" both work.
+    A contact can appear on several rows, one per historical interaction.
+    """
+    reader = csv.DictReader(stream)
+    if reader.fieldnames:
+        reader.fieldnames = [
+            (name or "").strip().lower().replace(" ", "_") for name in reader.fieldnames
+        ]
+    for fields in reader:
+        yield reader.line_num, fields
+
+
+def _unfold_vcard_lines(stream):
+    """Yield (line number, logical line), joining folded continuation lines."""
+    pending = None
+    pending_line = 0
+    for number, raw in enumerate(stream, start=1):
+        raw = raw.rstrip("\r\n")
+        if raw[:1] in (" ", "\t") and pending is not None:
+            pending += raw[1:]
+            continue
+        if pending is not None:
+            yield pending_line, pending
+        pending, pending_line = raw, number
+    if pending is not None:
+        yield pending_line, pending
+
+
+def _unescape_vcard(value):
+    return (
+        value.replace("\\n", "\n")
+        .replace("\\N", "\n")
+        .replace("\\,", ",")
+        .replace("\\;", ";")
+        .replace("\\\\", "\\")
+    )
+
+
+def iter_vcard_rows(stream):
+    """Yield (line, fields) for each card of a vCard file.
+
+    Only the first email and phone number of a card are kept.
+    """
+    fields = None
+    start = 0
+    for line, content in _unfold_vcard_lines(stream):
+        if not content.strip():
+            continue
+        prop, _, value = content.partition(":")
+        # Drop parameters (TEL;TYPE=cell) and group prefixes (item1.EMAIL)
+        prop = prop.split(";")[0].split(".")[-1].upper()
+
+        if prop == "BEGIN" and value.strip().upper() == "VCARD":
+            fields, start = {}, line
+        elif fields is None:
+            continue
+        elif prop == "END" and value.strip().upper() == "VCARD":
+            yield start, fields
+            fields = None
+        elif prop == "FN":
+            fields["name"] = _unescape_vcard(value)
+        elif prop == "N" and "name" not in fields:
+            family, _, rest = value.partition(";")
+            given = rest.split(";")[0]
+            fields["name"] = _unescape_vcard(f"{given} {family}".strip())
+        elif prop == "EMAIL":
+            fields.setdefault("email", value)
+        elif prop == "TEL":
+            fields.setdefault("phone", value.removeprefix("tel:"))
+        elif prop == "NOTE":
+            fields["notes"] = _unescape_vcard(value)
+
+
+PARSERS = {"csv": iter_csv_rows, "vcard": iter_vcard_rows}
+
+
+def detect_format(filename):
+    """Guess the import format from a file name."""
+    if filename and filename.lower().endswith((".vcf", ".vcard")):
+        return "vcard"
+    return "csv"
+
+
+class _NewContact:
+    """Contact waiting to be inserted; its id is set once its batch is written."""
+
+    __slots__ = ("id",)
+
+    def __init__(self):
+        self.id = None
+
+
+class ContactImporter:
+    """Streams rows into the database in batched executemany transactions.
+
+    Rows whose normalized email or phone matches an existing contact, or an
+    earlier row of the same file, are merged into that contact; only their
+    interaction is added.
+    """
+
+    def __init__(self, engine, batch_size=IMPORT_BATCH_SIZE, progress=None):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = ImportStats()
+        self._known = self._existing_keys()
+        self._contacts = []
+        self._interactions = []
+
+    def _existing_keys(self):
+        known = {}
+        with self.engine.connect() as connection:
+            query = select(Contact.id, Contact.email, Contact.phone)
+            for contact_id, email, phone in connection.execute(query):
+                for key in dedupe_keys(email, phone):
+                    known.setdefault(key, contact_id)
+        return known
+
+    def add(self, row):
+        """Queue one validated row, writing a batch when it is full."""
+        self.stats.rows += 1
+        keys = dedupe_keys(row.email, row.phone)
+        # Either an existing contact's id or a _NewContact from this import
+        contact = next((self._known[key] for key in keys if key in self._known), None)
+
+        if contact is None:
+            contact = _NewContact()
+            now = curr_time()
+            self._contacts.append(
+                (
+                    contact,
+                    {
+                        "name": row.name,
+                        "email": row.email,
+                        "phone": row.phone,
+                        "frequency_value": row.frequency_value,
+                        "frequency_unit": row.frequency_unit,
+                        "notes": row.notes,
+                        "created_at": now,
+                        "updated_at": now,
+                    },
+                )
+            )
+            self.stats.contacts_created += 1
+        else:
+            self.stats.contacts_matched += 1
+        for key in keys:
+            self._known.setdefault(key, contact)
+
+        if row.interaction_date is not None:
+            self._interactions.append(
+                (
+                    contact,
+                    {
+                        "interaction_type": row.interaction_type,
+                        "interaction_date": row.interaction_date,
+                        "notes": row.interaction_notes,
+                    },
+                )
+            )
+
+        if len(self._contacts) + len(self._interactions) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write queued contacts and interactions in one transaction."""
+        if not self._contacts and not self._interactions:
+            return
+
+        with self.engine.begin() as connection:
+            if self._contacts:
+                statement = insert(Contact).returning(
+                    Contact.id, sort_by_parameter_order=True
+                )
+                result = connection.execute(
+                    statement, [params for _, params in self._contacts]
+                )
+                for (contact, _), contact_id in zip(self._contacts, result.scalars()):
+                    contact.id = contact_id
+
+            touched = {contact.id for contact, _ in self._contacts}
+            if self._interactions:
+                params = []
+                for contact, values in self._interactions:
+                    contact_id = getattr(contact, "id", contact)
+                    params.append({"contact_id": contact_id, **values})
+                    touched.add(contact_id)
+                connection.execute(insert(Interaction), params)
+                self.stats.interactions_created += len(params)
+
+            refresh_due_dates(connection, touched)
+            bump_data_versions(connection, touched)
+
+        self._contacts = []
+        self._interactions = []
+
+        logger.info(f"Import progress: {self.stats}")
+        if self.progress:
+            self.progress(self.stats)
+
+    def run(self, records):
+        """Import (line, fields) records and return the final stats."""
+        for line, fields in records:
+            try:
+                row = validate_row(line, fields)
+            except InvalidRow as e:
+                self.stats.add_error(line, str(e))
+                continue
+            self.add(row)
+        self.flush()
+        return self.stats
+
+
+def import_contacts(
+    engine, stream, fmt="csv", batch_size=IMPORT_BATCH_SIZE, progress=None
+):
+    """Import contacts from a text stream of CSV or vCard data.
+
+    ``progress`` is called with the running ImportStats after every batch.
+    """
+    if fmt not in PARSERS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    importer = ContactImporter(engine, batch_size=batch_size, progress=progress)
+    stats = importer.run(PARSERS[fmt](stream))
+    logger.info(f"Import finished: {stats}")
+    return stats
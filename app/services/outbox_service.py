@@ -0,0 +1,157 @@
+import logging
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.models import EmailOutbox, OutboxStatus
+from app.time_utils import curr_time
+
+from .email_service import render_reminder_email, send_bulk
+
+logger = logging.getLogger(__name__)
+
+# A claimed batch that isn't finished by then is assumed abandoned
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Longest wait between delivery attempts
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def enqueue_email(session, subject, to_email, html_content, idempotency_key):
+    """Queue a rendered email for delivery and commit.
+
+    Returns False if a message with the same idempotency key was already
+    queued, in which case nothing is added.
+    """
+    statement = (
+        sqlite_insert(EmailOutbox)
+        .values(
+            idempotency_key=idempotency_key,
+            subject=subject,
+            to_email=to_email,
+            html_content=html_content,
+            status=OutboxStatus.PENDING,
+            attempts=0,
+            next_attempt_at=curr_time(),
+            created_at=curr_time(),
+        )
+        .on_conflict_do_nothing(index_elements=[EmailOutbox.idempotency_key])
+    )
+    queued = session.execute(statement).rowcount == 1
+    session.commit()
+
+    if queued:
+        logger.info(f"Queued email {idempotency_key} for {to_email}")
+    else:
+        logger.info(f"Email {idempotency_key} already queued, skipping")
+    return queued
+
+
+def queue_reminder_email(session, digests):
+    """Render the daily reminder email once and queue it for delivery.
+
+    The idempotency key is per day, so rerunning the job the same day never
+    sends a second reminder.
+    """
+    subject, to_email, html_content = render_reminder_email(digests)
+    return enqueue_email(
+        session,
+        subject,
+        to_email,
+        html_content,
+        idempotency_key=f"daily-reminder:{curr_time().date().isoformat()}:{to_email}",
+    )
+
+
+def retry_delay(attempts, base_delay):
+    """Exponential backoff after the given number of failed attempts."""
+    return min(base_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+
+def _claim_batch(session, now, batch_size):
+    """Mark a batch of due messages as being sent and return them.
+
+    Claiming happens in its own transaction, so concurrent workers never pick
+    up the same message. Claims expire after CLAIM_TIMEOUT in case the worker
+    dies mid-batch.
+    """
+    due_ids = (
+        select(EmailOutbox.id)
+        .where(
+            EmailOutbox.status.in_([OutboxStatus.PENDING, OutboxStatus.SENDING]),
+            EmailOutbox.next_attempt_at <= now,
+        )
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(batch_size)
+    )
+    claimed_ids = (
+        session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(due_ids))
+            .values(status=OutboxStatus.SENDING, next_attempt_at=now + CLAIM_TIMEOUT)
+            .returning(EmailOutbox.id)
+        )
+        .scalars()
+        .all()
+    )
+    session.commit()
+
+    if not claimed_ids:
+        return []
+    return (
+        session.query(EmailOutbox)
+        .filter(EmailOutbox.id.in_(claimed_ids))
+        .order_by(EmailOutbox.id)
+        .all()
+    )
+
+
+def deliver_outbox(session):
+    """Send queued emails in batches until nothing is due.
+
+    Failed messages are retried with exponential backoff and marked dead after
+    EMAIL_OUTBOX_MAX_ATTEMPTS. Returns the number of messages sent.
+    """
+    batch_size = current_app.config["EMAIL_OUTBOX_BATCH_SIZE"]
+    max_attempts = current_app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"]
+    base_delay = timedelta(seconds=current_app.config["EMAIL_OUTBOX_RETRY_DELAY"])
+
+    sent = 0
+    while True:
+        batch = _claim_batch(session, curr_time(), batch_size)
+        if not batch:
+            return sent
+
+        results = send_bulk(
+            (message.subject, message.to_email, message.html_content)
+            for message in batch
+        )
+
+        now = curr_time()
+        for message, result in zip(batch, results):
+            message.attempts += 1
+            if result.sent:
+                message.status = OutboxStatus.SENT
+                message.sent_at = now
+                message.last_error = None
+                sent += 1
+            elif message.attempts >= max_attempts:
+                message.status = OutboxStatus.DEAD
+                message.last_error = result.error
+                logger.error(
+                    f"Giving up on email {message.idempotency_key} after "
+                    f"{message.attempts} attempts: {result.error}"
+                )
+            else:
+                message.status = OutboxStatus.PENDING
+                message.next_attempt_at = now + retry_delay(
+                    message.attempts, base_delay
+                )
+                message.last_error = result.error
+        session.commit()
+
+        # Stop once a batch fails entirely, e.g. while the SMTP host is down
+        if not any(result.sent for result in results):
+            return sent
@@ -1,70 +1,285 @@
+import atexit
 import logging
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta
+from functools import wraps
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker
 
-from app.models import Contact, Interaction
+from app.metrics import time_job
+from app.models import (
+    Contact,
+    SchedulerLease,
+    next_due_in_range,
+)
+from app.time_utils import curr_time
+from app.view_models import contact_details, contact_row_columns
 
-from .email_service import send_reminder_email
+from .archive_service import archive_history
+from .outbox_service import deliver_outbox, queue_reminder_email
 
 logger = logging.getLogger(__name__)
 
+# Contacts are reminded from 5 days overdue until 1 day before they are due
+REMINDER_MIN_DAYS = -5
+REMINDER_MAX_DAYS = 1
+
+
+def collect_reminder_digests(session, now, chunk_size=500):
+    """Stream contacts in the reminder window and build a ContactDetail for each.
+
+    Candidates are selected with an indexed range on next_due_at and fetched
+    in chunks of ``chunk_size`` rows, so no ORM objects are kept around.
+    Returns the contacts, most overdue first, and the number of rows scanned.
+    """
+    query = (
+        select(*contact_row_columns(), Contact.email, Contact.phone)
+        .where(
+            next_due_in_range(
+                now,
+                start=now + timedelta(days=REMINDER_MIN_DAYS),
+                end=now + timedelta(days=REMINDER_MAX_DAYS + 1),
+            )
+        )
+        .execution_options(yield_per=chunk_size)
+    )
+
+    digests = []
+    scanned = 0
+    for chunk in session.execute(query).partitions():
+        scanned += len(chunk)
+        digests.extend(
+            contact
+            for contact in contact_details(chunk, now)
+            if REMINDER_MIN_DAYS <= contact.days_until_due <= REMINDER_MAX_DAYS
+        )
+
+    digests.sort(key=lambda digest: (digest.days_until_due, digest.name))
+    return digests, scanned
+
+
+class LeaderLease:
+    """Database lease that elects one process to run scheduled jobs.
+
+    Every worker runs a scheduler, but only the holder of the lease runs jobs.
+    The holder renews the lease periodically; if it dies the lease expires
+    after ``ttl`` seconds and another worker takes over.
+    """
+
+    def __init__(self, session_factory, name="scheduler", ttl=60):
+        self.Session = session_factory
+        self.name = name
+        self.ttl = timedelta(seconds=ttl)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+    def acquire(self):
+        """Take or renew the lease. Returns True if this process holds it."""
+        now = curr_time()
+        leases = SchedulerLease.__table__
+        statement = (
+            sqlite_insert(leases)
+            .values(name=self.name, holder=self.holder, expires_at=now + self.ttl)
+            .on_conflict_do_update(
+                index_elements=[leases.c.name],
+                set_={"holder": self.holder, "expires_at": now + self.ttl},
+                where=or_(leases.c.holder == self.holder, leases.c.expires_at < now),
+            )
+        )
+        try:
+            with self.Session() as session:
+                acquired = session.execute(statement).rowcount == 1
+                session.commit()
+        except Exception as e:
+            logger.error(f"Failed to renew scheduler lease: {str(e)}")
+            acquired = False
+
+        if acquired != self.is_leader:
+            state = "Acquired" if acquired else "Lost"
+            logger.info(f"{state} scheduler lease as {self.holder}")
+        self.is_leader = acquired
+        return acquired
+
+    def release(self):
+        """Give up the lease so another worker can take over immediately."""
+        if not self.is_leader:
+            return
+        with self.Session() as session:
+            session.execute(
+                update(SchedulerLease)
+                .where(
+                    SchedulerLease.name == self.name,
+                    SchedulerLease.holder == self.holder,
+                )
+                .values(holder=None, expires_at=curr_time())
+            )
+            session.commit()
+        self.is_leader = False
+        logger.info(f"Released scheduler lease as {self.holder}")
+
+
+def peak_rss_kib():
+    """The process's peak resident set size so far, in KiB.
+
+    Read from the kernel's own accounting, so unlike tracemalloc it costs
+    nothing while the job runs.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and KiB elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
 
 class SchedulerService:
     def __init__(self, app, db_engine):
         self.app = app
+        self.engine = db_engine
         self.Session = sessionmaker(bind=db_engine, expire_on_commit=True)
-        self.scheduler = BackgroundScheduler()
+        # Created by start(), so building the app doesn't import APScheduler, and
+        # each process forked from a preloaded app gets its own lease holder
+        self.lease = None
+        self.scheduler = None
+        self._start_lock = threading.Lock()
+
+    def _create_scheduler(self):
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        scheduler = BackgroundScheduler()
+        ttl = self.app.config["SCHEDULER_LEASE_TTL"]
 
         # Add jobs
-        self.scheduler.add_job(
-            self.send_daily_reminders, "cron", hour=7, minute=0, id="daily_reminders"
+        scheduler.add_job(
+            self.lease.acquire,
+            "interval",
+            seconds=max(1, ttl // 3),
+            id="renew_lease",
+            next_run_time=curr_time(),
+        )
+        scheduler.add_job(
+            self._leader_only(self.send_daily_reminders),
+            "cron",
+            hour=7,
+            minute=0,
+            id="daily_reminders",
+        )
+        scheduler.add_job(
+            self._leader_only(self.archive_interactions),
+            "cron",
+            hour=3,
+            minute=0,
+            id="archive_interactions",
         )
+        scheduler.add_job(
+            self._leader_only(self.deliver_emails),
+            "interval",
+            seconds=self.app.config["EMAIL_OUTBOX_INTERVAL"],
+            id="deliver_emails",
+            max_instances=1,
+            coalesce=True,
+        )
+        return scheduler
+
+    def _leader_only(self, job):
+        @wraps(job)
+        def run():
+            if not self.lease.acquire():
+                logger.debug(f"Skipping {job.__name__}: not the scheduler leader")
+                return
+            with time_job(self.app, job.__name__):
+                job()
+
+        return run
 
     def start(self):
-        """Start the scheduler."""
-        self.scheduler.start()
+        """Start the scheduler thread, unless disabled or already running.
+
+        Called by the serving entry point rather than create_app, so scripts
+        and shells that build the app don't start background jobs. Threads
+        don't survive fork(), so under gunicorn each worker calls this after
+        it is forked (see gunicorn.conf.py).
+        """
+        if not self.app.config["SCHEDULER_ENABLED"]:
+            return
+        with self._start_lock:
+            if self.scheduler is not None:
+                return
+            self.lease = LeaderLease(
+                self.Session, ttl=self.app.config["SCHEDULER_LEASE_TTL"]
+            )
+            self.scheduler = self._create_scheduler()
+            self.scheduler.start()
+            # Stop with the process, not with each request's app context
+            atexit.register(self.shutdown)
         logger.info("Scheduler started")
 
     def shutdown(self):
         """Shutdown the scheduler."""
-        if self.scheduler.running:
+        if self.scheduler is not None and self.scheduler.running:
             self.scheduler.shutdown()
             logger.info("Scheduler shut down")
+        if self.lease is not None:
+            self.lease.release()
 
     def send_daily_reminders(self):
         """Send daily reminder emails for contacts due soon."""
         logger.info("Running daily reminder job")
 
-        with self.Session() as session:
-            # Get all contacts
-            contacts = session.query(Contact).all()
+        started = time.perf_counter()
+        digests = []
+        scanned = 0
+        try:
+            with self.Session() as session:
+                digests, scanned = collect_reminder_digests(
+                    session,
+                    curr_time(),
+                    chunk_size=self.app.config["REMINDER_CHUNK_SIZE"],
+                )
 
-            # Filter for contacts due today or tomorrow
-            due_contacts = []
-            for contact in contacts:
-                days_until_due = contact.days_until_due
-                if -5 <= days_until_due <= 1:  # Include slightly overdue contacts
-                    due_contacts.append(contact)
+                if digests:
+                    logger.info(f"Found {len(digests)} contacts due for communication")
+                    # Queue email with the list of contacts due
+                    with self.app.app_context():
+                        queued = queue_reminder_email(session, digests)
+                    if queued:
+                        self.wake_email_delivery()
+                else:
+                    logger.info("No contacts due for communication today")
+        finally:
+            logger.info(
+                f"Daily reminder job finished: scanned={scanned} "
+                f"selected={len(digests)} "
+                f"elapsed={time.perf_counter() - started:.3f}s "
+                f"peak_rss={peak_rss_kib()}KiB"
+            )
 
-            if due_contacts:
-                logger.info(f"Found {len(due_contacts)} contacts due for communication")
-                # Send email with the list of contacts due
-                with self.app.app_context():
-                    send_reminder_email(due_contacts)
-            else:
-                logger.info("No contacts due for communication today")
+    def archive_interactions(self):
+        """Move interactions past the archive horizon out of the hot table."""
+        moved = archive_history(
+            self.engine, self.app.config["INTERACTION_ARCHIVE_DAYS"]
+        )
+        if moved:
+            logger.info(f"Archived {moved} interactions")
 
+    def deliver_emails(self):
+        """Drain the email outbox."""
+        with self.Session() as session, self.app.app_context():
+            sent = deliver_outbox(session)
+        if sent:
+            logger.info(f"Delivered {sent} queued emails")
 
-def init_scheduler(app, db_engine):
-    """Initialize and start the scheduler."""
-    scheduler_service = SchedulerService(app, db_engine)
-    scheduler_service.start()
+    def wake_email_delivery(self):
+        """Run the outbox worker now instead of waiting for its next interval."""
+        if self.scheduler is not None and self.scheduler.running:
+            self.scheduler.modify_job("deliver_emails", next_run_time=curr_time())
 
-    # Register shutdown handler
-    @app.teardown_appcontext
-    def shutdown_scheduler(exception=None):
-        scheduler_service.shutdown()
 
-    return scheduler_service
+def init_scheduler(app, db_engine):
+    """Create the scheduler service; call its start() to run the jobs."""
+    return SchedulerService(app, db_engine)
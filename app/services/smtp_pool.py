@@ -0,0 +1,126 @@
+"""Pooled SMTP connections, imported on first send since smtplib is slow to load."""
+
+import smtplib
+import threading
+from collections import namedtuple
+
+SendResult = namedtuple("SendResult", ["to_email", "sent", "error"])
+
+
+class SMTPConnectionPool:
+    """Keeps authenticated SMTP connections open for reuse.
+
+    Idle connections are checked with NOOP before being handed out and are
+    replaced transparently when the server has dropped them.
+    """
+
+    def __init__(
+        self, host, port, user=None, password=None, use_tls=True, size=2, timeout=30
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.size = size
+        self.timeout = timeout
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            _close_quietly(server)
+            raise
+        return server
+
+    @staticmethod
+    def _is_alive(server):
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _acquire(self):
+        while True:
+            with self._lock:
+                server = self._idle.pop() if self._idle else None
+            if server is None:
+                return self._connect()
+            if self._is_alive(server):
+                return server
+            _close_quietly(server)
+
+    def _release(self, server):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(server)
+                return
+        _close_quietly(server)
+
+    def send_bulk(self, messages):
+        """Send many messages over one session, reconnecting if it drops.
+
+        Returns a SendResult per message, in order.
+        """
+        messages = list(messages)
+        results = []
+        server = None
+        try:
+            for index, message in enumerate(messages):
+                for attempt in range(2):
+                    if server is None:
+                        try:
+                            server = self._acquire()
+                        except (smtplib.SMTPException, OSError) as e:
+                            # The server is unreachable; fail the rest of the batch
+                            results.extend(
+                                SendResult(m["To"], False, str(e))
+                                for m in messages[index:]
+                            )
+                            return results
+                    try:
+                        server.send_message(message)
+                        results.append(SendResult(message["To"], True, None))
+                        break
+                    except (smtplib.SMTPException, OSError) as e:
+                        if not _connection_lost(e):
+                            # The server rejected this message; the session is fine
+                            results.append(SendResult(message["To"], False, str(e)))
+                            break
+                        # Retry once on a fresh connection
+                        _close_quietly(server)
+                        server = None
+                        if attempt:
+                            results.append(SendResult(message["To"], False, str(e)))
+        finally:
+            if server is not None:
+                self._release(server)
+        return results
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            _close_quietly(server)
+
+
+def _connection_lost(error):
+    """Whether a connection can't be trusted for another message after error."""
+    # smtplib's errors are all OSErrors, but most are a reply refusing one message
+    if isinstance(error, smtplib.SMTPException):
+        return isinstance(error, smtplib.SMTPServerDisconnected)
+    return True
+
+
+def _close_quietly(server):
+    try:
+        server.quit()
+    except (smtplib.SMTPException, OSError):
+        server.close()
@@ -0,0 +1,197 @@
+"""Out-of-band fragments that bring the current page up to date after a write.
+
+Mutation endpoints answer HTMX requests with these instead of a full page, or
+a trigger that makes every card on the page refetch. Only the fragments the
+requesting page actually shows are rendered; the page is found from the
+HX-Current-URL header HTMX sends.
+"""
+
+from urllib.parse import parse_qs, urlsplit
+
+import flask
+from flask import current_app, render_template, request, url_for
+from sqlalchemy import select
+from werkzeug.exceptions import HTTPException
+
+from app.cadence import RECENT_GAPS
+from app.models import ROLLUP_RECENT_DAYS, Contact
+from app.view_models import (
+    SORT_ORDERS,
+    contact_filter,
+    contact_order,
+    contact_page_filter,
+    contact_row_columns,
+    contact_rows,
+    contact_sort_value,
+    load_cadence_summary,
+    load_contact_counts,
+    load_contact_detail,
+    load_contact_rows,
+    load_interaction_summary,
+    load_priority_contacts,
+    load_recent_interactions,
+)
+
+LIST_PAGE = "contacts.list_contacts"
+DASHBOARD_PAGE = "dashboard.index"
+DETAIL_PAGE = "contacts.detail_page"
+
+
+def is_htmx_request():
+    return request.headers.get("HX-Request") == "true"
+
+
+def current_page():
+    """The endpoint, view args and query args of the page that sent an HTMX request.
+
+    Query args map each name to its first value.
+    """
+    url = request.headers.get("HX-Current-URL")
+    if not url:
+        return None, {}, {}
+    parts = urlsplit(url)
+    query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+    adapter = current_app.url_map.bind_to_environ(request.environ)
+    try:
+        endpoint, args = adapter.match(parts.path, method="GET")
+    except HTTPException:
+        return None, {}, {}
+    return endpoint, args, query
+
+
+def _response(context, trigger=None):
+    body = render_template("updates.html", **context) if context else ""
+    response = flask.Response(body)
+    if trigger:
+        response.headers["HX-Trigger"] = trigger
+    return response
+
+
+def _dashboard_context(session, now):
+    return {
+        "counts": load_contact_counts(session, now),
+        "priority_contacts": load_priority_contacts(session, now),
+    }
+
+
+def _list_changes(session, now, query, changed, deleted=()):
+    """Context and trigger that update the contact list in its filter and order.
+
+    Changed contacts are taken out of the list, and those still passing its
+    filter are put back before the contact that now follows them. If that
+    contact isn't shown yet, neither is the changed one; it arrives with a
+    later page. If no contact follows, whether the list reaches the end isn't
+    known here, so the whole list is refreshed instead.
+    """
+    filter_type = query.get("filter", "all")
+    sort = query.get("sort", "due")
+    if sort not in SORT_ORDERS:
+        sort = "due"
+    condition = contact_filter(filter_type, now)
+
+    rows = []
+    if changed:
+        statement = select(*contact_row_columns()).where(Contact.id.in_(changed))
+        if condition is not None:
+            statement = statement.where(condition)
+        rows = session.execute(statement).all()
+    # Rows put back before the same contact go in in list order; a few rows
+    # sort cheaper here than in SQL, where NULL due dates also come first
+    rows.sort(
+        key=lambda row: (
+            contact_sort_value(row, sort) is not None,
+            contact_sort_value(row, sort),
+            row.id,
+        )
+    )
+
+    moved = []
+    refresh = False
+    for row, contact in zip(rows, contact_rows(rows, now)):
+        following = select(Contact.id).where(
+            contact_page_filter(
+                filter_type, sort, now, (contact_sort_value(row, sort), row.id)
+            ),
+            Contact.id.not_in(changed),
+        )
+        next_id = session.execute(
+            following.order_by(*contact_order(sort)).limit(1)
+        ).scalar()
+        if next_id is None:
+            refresh = True
+            break
+        moved.append((next_id, contact))
+
+    context = {"deleted_contacts": [*deleted, *changed]}
+    if refresh:
+        return context, "contact-list"
+    context["moved_contacts"] = moved
+    return context, None
+
+
+def contacts_changed(session, now, created=(), updated=(), deleted=()):
+    """Respond to contacts being created, edited or deleted, given their ids."""
+    endpoint, args, query = current_page()
+    context = {}
+    trigger = None
+
+    if endpoint == LIST_PAGE:
+        context, trigger = _list_changes(
+            session, now, query, [*created, *updated], deleted
+        )
+    elif endpoint == DASHBOARD_PAGE:
+        context.update(_dashboard_context(session, now))
+    elif endpoint == DETAIL_PAGE:
+        contact_id = args["contact_id"]
+        if contact_id in deleted:
+            # The page is gone, so go to the contact list instead
+            response = flask.Response("")
+            response.headers["HX-Location"] = url_for("contacts.list_contacts")
+            return response
+        if contact_id in updated:
+            context["contact"] = load_contact_detail(session, contact_id, now)
+
+    return _response(context, trigger)
+
+
+def interactions_changed(session, now, contact_ids, added=None, deleted=()):
+    """Respond to interactions of the given contacts being added or deleted.
+
+    ``added`` is the InteractionRow of a newly logged interaction and
+    ``deleted`` the ids of deleted ones.
+    """
+    endpoint, args, query = current_page()
+    context = {}
+    trigger = None
+
+    if endpoint == LIST_PAGE:
+        context, trigger = _list_changes(session, now, query, list(contact_ids))
+    elif endpoint == DASHBOARD_PAGE:
+        context.update(_dashboard_context(session, now))
+        context["recent_interactions"] = load_recent_interactions(session)
+    elif endpoint == DETAIL_PAGE and args["contact_id"] in contact_ids:
+        contact_id = args["contact_id"]
+        summary = load_interaction_summary(session, contact_id)
+        context.update(
+            summary_contact_id=contact_id,
+            summary=summary,
+            recent_days=ROLLUP_RECENT_DAYS,
+            stats_contact_id=contact_id,
+            stats=load_cadence_summary(session, contact_id, now),
+            recent_gaps=RECENT_GAPS,
+            deleted_interactions=deleted,
+        )
+        if added is not None:
+            [contact] = load_contact_rows(session, [contact_id], now)
+            if summary.total_count > 1 and added.interaction_date == (
+                contact.last_interaction_at
+            ):
+                context["new_interaction"] = added
+            else:
+                # The first interaction, or one logged out of order
+                trigger = f"interactions-{contact_id}"
+        elif summary is None:
+            # Nothing left to show, so let the history render its empty state
+            trigger = f"interactions-{contact_id}"
+
+    return _response(context, trigger)
@@ -0,0 +1,449 @@
+"""Read-only rows handed to templates instead of ORM objects.
+
+Each view model is built from a narrow column query, so rendering never
+triggers lazy loads, works after the session has closed, and costs the same
+for every row.
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, case, desc, func, or_, select, tuple_
+
+from app.cadence import cadence_trend
+from app.due_engine import compute_due, due_rows
+from app.models import (
+    ArchivedInteraction,
+    Contact,
+    ContactStats,
+    FrequencyUnit,
+    Interaction,
+    InteractionRollup,
+    InteractionType,
+    latest_interaction_type,
+    next_due_in_range,
+)
+
+# Orders the contact list can be sorted in
+SORT_ORDERS = ("due", "name")
+
+# Number of contacts shown in the dashboard's priority list
+PRIORITY_CONTACTS_LIMIT = 5
+
+# Contacts due within this long count as due soon on the dashboard
+DUE_SOON_WINDOW = timedelta(days=7)
+
+# Number of interactions shown in the dashboard's recent feed
+RECENT_INTERACTIONS_LIMIT = 5
+
+# Characters of notes fetched for the recent feed, which truncates them to 70
+NOTES_PREVIEW_LENGTH = 100
+
+
+@dataclass(frozen=True, slots=True)
+class ContactRow:
+    """A contact as shown in lists: name, last interaction and due state."""
+
+    id: int
+    name: str
+    last_interaction_at: datetime | None
+    last_interaction_type: InteractionType | None
+    next_due: datetime
+    days_until_due: int
+    status: str
+
+
+@dataclass(frozen=True, slots=True)
+class ContactDetail(ContactRow):
+    """A contact with its details, for the detail page, forms and emails."""
+
+    email: str | None = None
+    phone: str | None = None
+    frequency_value: int = 1
+    frequency_unit: FrequencyUnit = FrequencyUnit.MONTH
+    notes: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class InteractionRow:
+    id: int
+    contact_id: int
+    interaction_type: InteractionType
+    interaction_date: datetime
+    notes: str | None
+    contact_name: str | None = None
+    archived: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class InteractionSummary:
+    """A contact's interaction totals, archived interactions included."""
+
+    total_count: int
+    recent_count: int
+    first_interaction_at: datetime | None
+
+
+@dataclass(frozen=True, slots=True)
+class ContactCounts:
+    """The dashboard's contact counters."""
+
+    overdue: int
+    due_soon: int
+    total: int
+
+
+@dataclass(frozen=True, slots=True)
+class CadenceSummary:
+    """A contact's cadence statistics, as stored in ContactStats.
+
+    current_streak is 0 while the contact is overdue, even though the stored
+    streak only changes when an interaction is logged.
+    """
+
+    contact_id: int
+    gap_count: int
+    mean_gap_days: float
+    median_gap_days: float
+    recent_mean_gap_days: float
+    on_time_count: int
+    current_streak: int
+    longest_streak: int
+    expected_periods: int
+    missed_periods: int
+    missed_pct: float
+    trend: str
+    computed_at: datetime
+
+
+def contact_row_columns():
+    """Columns needed to build a ContactRow.
+
+    next_due_at is the stored due date, which list queries sort and page on.
+    """
+    return (
+        Contact.id,
+        Contact.name,
+        Contact.frequency_value,
+        Contact.frequency_unit,
+        Contact.last_interaction_at,
+        Contact.next_due_at,
+        latest_interaction_type(),
+    )
+
+
+def contact_detail_columns():
+    """Columns needed to build a ContactDetail."""
+    return contact_row_columns() + (
+        Contact.email,
+        Contact.phone,
+        Contact.notes,
+    )
+
+
+def contact_rows(rows, now):
+    """Build ContactRows from rows selected with contact_row_columns()."""
+    due = compute_due(due_rows(rows), now)
+    return [
+        ContactRow(
+            id=row.id,
+            name=row.name,
+            last_interaction_at=row.last_interaction_at,
+            last_interaction_type=row.last_interaction_type,
+            next_due=next_due,
+            days_until_due=days,
+            status=status,
+        )
+        for row, next_due, days, status in zip(
+            rows, due.next_due, due.days_until_due, due.status
+        )
+    ]
+
+
+def contact_details(rows, now):
+    """Build ContactDetails from rows selected with contact_detail_columns().
+
+    Rows without the email, phone or notes columns leave them as None.
+    """
+    due = compute_due(due_rows(rows), now)
+    details = []
+    for row, next_due, days, status in zip(
+        rows, due.next_due, due.days_until_due, due.status
+    ):
+        fields = row._mapping
+        details.append(
+            ContactDetail(
+                id=row.id,
+                name=row.name,
+                last_interaction_at=row.last_interaction_at,
+                last_interaction_type=row.last_interaction_type,
+                next_due=next_due,
+                days_until_due=days,
+                status=status,
+                email=fields.get("email"),
+                phone=fields.get("phone"),
+                frequency_value=row.frequency_value,
+                frequency_unit=row.frequency_unit,
+                notes=fields.get("notes"),
+            )
+        )
+    return details
+
+
+def load_contact_detail(session, contact_id, now):
+    """Return the ContactDetail for a contact, or None if it doesn't exist."""
+    row = session.execute(
+        select(*contact_detail_columns()).where(Contact.id == contact_id)
+    ).first()
+    if row is None:
+        return None
+    return contact_details([row], now)[0]
+
+
+def load_contact_counts(session, now):
+    """Count overdue, due-within-7-days and total contacts in one statement."""
+    overdue = next_due_in_range(now, end=now)
+    due_soon = next_due_in_range(now, start=now, end=now + DUE_SOON_WINDOW)
+    row = session.query(
+        func.count(case((overdue, 1))),
+        func.count(case((due_soon, 1))),
+        func.count(Contact.id),
+    ).one()
+    return ContactCounts(*row)
+
+
+def load_priority_contacts(session, now, limit=PRIORITY_CONTACTS_LIMIT):
+    """Return the first ContactRows by due date that are due within 7 days.
+
+    Contacts without interactions are due now but have no stored due date,
+    so the two groups are fetched with separate bounded queries and merged.
+    """
+    window_end = now + DUE_SOON_WINDOW
+    scheduled = (
+        session.query(*contact_row_columns())
+        .filter(Contact.next_due_at < window_end)
+        .order_by(Contact.next_due_at, Contact.id)
+        .limit(limit)
+        .all()
+    )
+    never_contacted = (
+        session.query(*contact_row_columns())
+        .filter(Contact.next_due_at.is_(None))
+        .order_by(Contact.id)
+        .limit(limit)
+        .all()
+    )
+    rows = heapq.nsmallest(
+        limit,
+        scheduled + never_contacted,
+        key=lambda row: row.next_due_at or now,
+    )
+    return contact_rows(rows, now)
+
+
+def load_contact_rows(session, contact_ids, now):
+    """Return ContactRows for the given contacts, in no particular order."""
+    rows = session.execute(
+        select(*contact_row_columns()).where(Contact.id.in_(contact_ids))
+    ).all()
+    return contact_rows(rows, now)
+
+
+def contact_filter(filter_type, now, dated_only=False):
+    """SQL filter for a contact list filter, or None for all contacts.
+
+    With ``dated_only``, contacts without a due date are left out even where
+    the filter would take them.
+    """
+    if filter_type == "due":
+        # Due within a day: days_until_due <= 1
+        end = now + timedelta(days=2)
+    elif filter_type == "overdue":
+        # Already past due: days_until_due < 0
+        end = now
+    else:
+        return None
+    if dated_only:
+        return and_(Contact.next_due_at.is_not(None), Contact.next_due_at < end)
+    return next_due_in_range(now, end=end)
+
+
+def contact_order(sort):
+    """ORDER BY columns for a contact list sort order."""
+    if sort == "name":
+        return (Contact.name, Contact.id)
+    return (Contact.next_due_at, Contact.id)
+
+
+def contact_sort_value(row, sort):
+    """The sort key of a row selected with contact_row_columns(), without its id."""
+    return row.name if sort == "name" else row.next_due_at
+
+
+def contact_keyset_filter(sort, cursor_values):
+    """Filter for rows that come after ``(sort value, id)`` in a sort order."""
+    value, last_id = cursor_values
+    if sort == "name":
+        return tuple_(Contact.name, Contact.id) > tuple_(value, last_id)
+
+    # Contacts without interactions have no due date and sort first
+    if value is None:
+        return or_(
+            and_(Contact.next_due_at.is_(None), Contact.id > last_id),
+            Contact.next_due_at.is_not(None),
+        )
+    return and_(
+        Contact.next_due_at.is_not(None),
+        tuple_(Contact.next_due_at, Contact.id) > tuple_(value, last_id),
+    )
+
+
+def contact_page_filter(filter_type, sort, now, after=None):
+    """SQL filter for the rows of a contact list, or None for all contacts.
+
+    With ``after``, a ``(sort value, id)`` pair, only rows that come after it.
+    """
+    # Past the undated contacts, leaving out the filter's arm for them lets
+    # SQLite read the due date index in order instead of sorting a union
+    past_undated = after is not None and sort == "due" and after[0] is not None
+    conditions = []
+    condition = contact_filter(filter_type, now, dated_only=past_undated)
+    if condition is not None:
+        conditions.append(condition)
+    if after is not None:
+        conditions.append(contact_keyset_filter(sort, after))
+    return and_(*conditions) if conditions else None
+
+
+def interaction_row_columns(
+    with_contact_name=False, model=Interaction, notes_length=None
+):
+    """Columns needed to build an InteractionRow.
+
+    With ``with_contact_name`` the query must join Contact. Pass
+    ``model=ArchivedInteraction`` to read from the archive. ``notes_length``
+    fetches only the start of the notes, for views that truncate them.
+    """
+    notes = model.notes
+    if notes_length is not None:
+        notes = func.substr(notes, 1, notes_length).label("notes")
+    columns = (
+        model.id,
+        model.contact_id,
+        model.interaction_type,
+        model.interaction_date,
+        notes,
+    )
+    if with_contact_name:
+        columns += (Contact.name.label("contact_name"),)
+    return columns
+
+
+def interaction_rows(rows, archived=False):
+    """Build InteractionRows from rows selected with interaction_row_columns()."""
+    return [
+        InteractionRow(
+            id=row.id,
+            contact_id=row.contact_id,
+            interaction_type=row.interaction_type,
+            interaction_date=row.interaction_date,
+            notes=row.notes,
+            contact_name=row._mapping.get("contact_name"),
+            archived=archived,
+        )
+        for row in rows
+    ]
+
+
+def load_recent_interactions(session, limit=RECENT_INTERACTIONS_LIMIT):
+    """Return the latest InteractionRows across all contacts."""
+    return interaction_rows(
+        session.query(
+            *interaction_row_columns(
+                with_contact_name=True, notes_length=NOTES_PREVIEW_LENGTH
+            )
+        )
+        .join(Contact, Interaction.contact_id == Contact.id)
+        .order_by(desc(Interaction.interaction_date))
+        .limit(limit)
+    )
+
+
+def load_interaction_summary(session, contact_id):
+    """Return a contact's InteractionSummary, or None if it has no interactions."""
+    row = session.execute(
+        select(
+            InteractionRollup.total_count,
+            InteractionRollup.recent_count,
+            InteractionRollup.first_interaction_at,
+        ).where(InteractionRollup.contact_id == contact_id)
+    ).first()
+    if row is None:
+        return None
+    return InteractionSummary(*row)
+
+
+def interactions_query(session, contact_id):
+    """Query a contact's live interactions, newest first."""
+    return (
+        session.query(*interaction_row_columns())
+        .filter(Interaction.contact_id == contact_id)
+        .order_by(Interaction.interaction_date.desc(), Interaction.id.desc())
+    )
+
+
+def archived_interactions_query(session, contact_id):
+    """Query a contact's archived interactions, newest first."""
+    return (
+        session.query(*interaction_row_columns(model=ArchivedInteraction))
+        .filter(ArchivedInteraction.contact_id == contact_id)
+        .order_by(
+            ArchivedInteraction.interaction_date.desc(),
+            ArchivedInteraction.id.desc(),
+        )
+    )
+
+
+def cadence_columns():
+    """Columns needed to build a CadenceSummary."""
+    return tuple(ContactStats.__table__.columns) + (Contact.next_due_at,)
+
+
+def cadence_summaries(rows, now):
+    """Build CadenceSummaries from rows selected with cadence_columns()."""
+    summaries = []
+    for row in rows:
+        overdue = row.next_due_at is not None and row.next_due_at < now
+        summaries.append(
+            CadenceSummary(
+                contact_id=row.contact_id,
+                gap_count=row.gap_count,
+                mean_gap_days=row.mean_gap_days,
+                median_gap_days=row.median_gap_days,
+                recent_mean_gap_days=row.recent_mean_gap_days,
+                on_time_count=row.on_time_count,
+                current_streak=0 if overdue else row.current_streak,
+                longest_streak=row.longest_streak,
+                expected_periods=row.expected_periods,
+                missed_periods=row.missed_periods,
+                missed_pct=100 * row.missed_periods / row.expected_periods,
+                trend=cadence_trend(row.mean_gap_days, row.recent_mean_gap_days),
+                computed_at=row.computed_at,
+            )
+        )
+    return summaries
+
+
+def cadence_query(session):
+    """Query stored cadence statistics joined to their contacts."""
+    return session.query(*cadence_columns()).join(
+        Contact, Contact.id == ContactStats.contact_id
+    )
+
+
+def load_cadence_summary(session, contact_id, now):
+    """Return a contact's CadenceSummary, or None if it has no stats."""
+    rows = cadence_query(session).filter(ContactStats.contact_id == contact_id)
+    summaries = cadence_summaries(rows, now)
+    return summaries[0] if summaries else None
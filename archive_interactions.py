@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Script to move old Round Again interactions into the archive table
+
+import argparse
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from app.models import ROLLUP_RECENT_DAYS, init_db
+from app.services.archive_service import archive_history
+
+
+def main():
+    """Archive interactions older than the configured horizon"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Archive old interactions")
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=int(os.environ.get('INTERACTION_ARCHIVE_DAYS', 730)),
+        help=f"Archive interactions older than this many days, at least "
+        f"{ROLLUP_RECENT_DAYS}; 0 archives nothing",
+    )
+    args = parser.parse_args()
+    if args.days != 0 and args.days < ROLLUP_RECENT_DAYS:
+        parser.error(f'--days must be 0 or at least {ROLLUP_RECENT_DAYS}')
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    logger.info(f"Archiving interactions older than {args.days} days...")
+
+    engine = init_db(os.environ.get('DATABASE_URL'))
+    moved = archive_history(engine, args.days)
+
+    logger.info(f"Archived {moved} interactions!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# Script to populate stored due dates for existing Round Again contacts
+
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from app.models import backfill_due_dates, init_db
+
+
+def main():
+    """Recompute last interaction and next due dates for every contact"""
+    load_dotenv()
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    logger.info("Backfilling contact due dates...")
+
+    # init_db adds the due date columns to older databases if needed
+    engine = init_db(os.environ.get('DATABASE_URL'))
+    updated = backfill_due_dates(engine)
+
+    logger.info(f"Due dates backfilled for {updated} contacts!")
+
+if __name__ == "__main__":
+    main()
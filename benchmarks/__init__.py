@@ -0,0 +1,9 @@
+"""Performance benchmarks for Round Again, run with ``make bench``."""
+
+# Named dataset sizes, in contacts
+SIZES = {"small": 1_000, "medium": 10_000, "large": 100_000}
+
+
+def parse_size(value):
+    """Accept a named size or a plain number of contacts."""
+    return SIZES.get(value) or int(value)
@@ -0,0 +1,90 @@
+"""Check that a fresh process can import the app and serve a first request
+within a time budget.
+
+    python -m benchmarks.cold_start --budget-ms 1500
+
+Each run starts a new interpreter, so imports, app construction, the first
+database connection and template compilation are all measured cold. The
+first run also fills the Jinja bytecode cache, which later runs reuse.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from app.models import init_db
+from benchmarks.run import DATA_DIR
+
+DEFAULT_BUDGET_MS = 1500
+
+# Runs in the child process; prints its timings as JSON
+PROBE = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app({"SCHEDULER_ENABLED": False})
+created = time.perf_counter()
+response = app.test_client().get("/")
+assert response.status_code == 200, response.status_code
+served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (served - created) * 1000,
+    "total_ms": (served - started) * 1000,
+}))
+"""
+
+
+def measure(database, cache_dir):
+    env = dict(
+        os.environ,
+        DATABASE_URL=database,
+        JINJA_BYTECODE_CACHE_DIR=cache_dir,
+        SERVER_NAME="localhost",
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Round Again cold start")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    database = os.path.join(DATA_DIR, "cold-start.db")
+    cache_dir = os.path.join(DATA_DIR, "jinja-cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    init_db(database)
+
+    runs = [measure(database, cache_dir) for _ in range(args.runs)]
+    for i, run in enumerate(runs):
+        label = "cold cache" if i == 0 else "warm cache"
+        print(
+            f"run {i + 1} ({label}): import {run['import_ms']:.0f}ms, "
+            f"create_app {run['create_app_ms']:.0f}ms, "
+            f"first request {run['first_request_ms']:.0f}ms, "
+            f"total {run['total_ms']:.0f}ms"
+        )
+
+    # Judge on the best warm run, which is what a restarted worker sees
+    best = min(run["total_ms"] for run in runs[1:] or runs)
+    print(f"\nbest total {best:.0f}ms, budget {args.budget_ms:.0f}ms")
+    if best > args.budget_ms:
+        print("Cold start is over budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
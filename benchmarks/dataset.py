@@ -0,0 +1,191 @@
+"""Seeded generator for large, realistic Round Again databases.
+
+python -m benchmarks.dataset --contacts 10000 --output bench.db
+"""
+
+import argparse
+import logging
+import os
+import random
+from datetime import timedelta
+
+from sqlalchemy import func, insert, select
+
+from app.models import (
+    Contact,
+    FrequencyUnit,
+    Interaction,
+    InteractionType,
+    backfill_due_dates,
+    init_db,
+)
+from app.time_utils import curr_time
+from benchmarks import SIZES, parse_size
+
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = [
+    "Ada", "Alan", "Amara", "Ben", "Carmen", "Chen", "Dana", "Diego", "Elena",
+    "Emeka", "Fatima", "Grace", "Hana", "Ivan", "Jamal", "Julia", "Kenji",
+    "Lena", "Luis", "Maya", "Nadia", "Noah", "Olga", "Omar", "Priya", "Quinn",
+    "Rosa", "Sam", "Sofia", "Tariq", "Uma", "Victor", "Wei", "Yara", "Zoe",
+]  # fmt: skip
+
+LAST_NAMES = [
+    "Abara", "Berg", "Costa", "Dubois", "Eze", "Fischer", "Garcia", "Haddad",
+    "Ito", "Jensen", "Kim", "Lopez", "Mensah", "Novak", "Okafor", "Patel",
+    "Quist", "Rossi", "Silva", "Tanaka", "Ueda", "Varga", "Wong", "Xu",
+    "Yilmaz", "Zhang",
+]  # fmt: skip
+
+NOTE_WORDS = [
+    "caught", "up", "about", "work", "family", "trip", "birthday", "new",
+    "job", "moving", "soon", "coffee", "lunch", "kids", "school", "project",
+    "wedding", "plans", "hiking", "book", "recommendation", "recipe", "game",
+    "concert", "visit", "holiday", "garden", "running", "marathon", "health",
+]  # fmt: skip
+
+# Most people are kept in touch with monthly; a few weekly or yearly
+FREQUENCY_WEIGHTS = [
+    (FrequencyUnit.DAY, 2),
+    (FrequencyUnit.WEEK, 25),
+    (FrequencyUnit.MONTH, 55),
+    (FrequencyUnit.YEAR, 18),
+]
+
+INTERACTION_TYPE_WEIGHTS = [
+    (InteractionType.CALL, 25),
+    (InteractionType.TEXT, 35),
+    (InteractionType.VIDEO, 10),
+    (InteractionType.EMAIL, 15),
+    (InteractionType.IN_PERSON, 10),
+    (InteractionType.OTHER, 5),
+]
+
+# Rows per executemany batch
+BATCH_SIZE = 5_000
+
+# How far back generated interaction history goes
+HISTORY_DAYS = 3 * 365
+
+
+def _weighted(rng, weights):
+    values, counts = zip(*weights)
+    return rng.choices(values, weights=counts)[0]
+
+
+def _notes(rng, words=8):
+    return " ".join(rng.choices(NOTE_WORDS, k=rng.randint(2, words)))
+
+
+def _interaction_count(rng, mean):
+    """Skewed count: most contacts have a few interactions, some have hundreds."""
+    return min(int(rng.paretovariate(1.5) * mean / 3), mean * 40)
+
+
+def generate_dataset(
+    database_url, contacts=SIZES["small"], interactions_per_contact=20, seed=42
+):
+    """Fill a database with generated contacts and interaction history.
+
+    The same seed and sizes always produce the same data. Returns the number
+    of contacts and interactions created.
+    """
+    rng = random.Random(seed)
+    engine = init_db(database_url)
+    now = curr_time()
+
+    contact_rows = []
+    interaction_rows = []
+    interaction_total = 0
+
+    def flush():
+        with engine.begin() as connection:
+            if contact_rows:
+                connection.execute(insert(Contact), contact_rows)
+            if interaction_rows:
+                connection.execute(insert(Interaction), interaction_rows)
+        contact_rows.clear()
+        interaction_rows.clear()
+
+    for contact_id in range(1, contacts + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = now - timedelta(days=rng.randint(0, HISTORY_DAYS))
+        contact_rows.append(
+            {
+                "id": contact_id,
+                "name": f"{first} {last}",
+                "email": f"{first}.{last}{contact_id}@example.com".lower(),
+                "phone": f"555-{rng.randint(0, 9999999):07d}",
+                "frequency_value": rng.choice([1, 1, 1, 2, 3, 6]),
+                "frequency_unit": _weighted(rng, FREQUENCY_WEIGHTS),
+                "notes": _notes(rng) if rng.random() < 0.6 else None,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+
+        # About one in ten contacts has never been contacted
+        if rng.random() >= 0.1:
+            for _ in range(_interaction_count(rng, interactions_per_contact)):
+                interaction_rows.append(
+                    {
+                        "contact_id": contact_id,
+                        "interaction_type": _weighted(rng, INTERACTION_TYPE_WEIGHTS),
+                        "interaction_date": now
+                        - timedelta(minutes=rng.randint(0, HISTORY_DAYS * 24 * 60)),
+                        "notes": _notes(rng, 12) if rng.random() < 0.7 else None,
+                    }
+                )
+                interaction_total += 1
+
+        if len(contact_rows) + len(interaction_rows) >= BATCH_SIZE:
+            flush()
+
+    flush()
+    backfill_due_dates(engine)
+    logger.info(f"Generated {contacts} contacts and {interaction_total} interactions")
+    return contacts, interaction_total
+
+
+def ensure_dataset(path, contacts, seed=42):
+    """Generate the dataset at path unless it already holds contacts."""
+    engine = init_db(path)
+    with engine.connect() as connection:
+        existing = connection.execute(select(func.count(Contact.id))).scalar()
+    if existing:
+        return existing
+    logger.info(f"Generating benchmark dataset {path}")
+    return generate_dataset(path, contacts=contacts, seed=seed)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a Round Again dataset")
+    parser.add_argument(
+        "--contacts",
+        default="small",
+        help=f"Number of contacts, or one of {', '.join(SIZES)}",
+    )
+    parser.add_argument(
+        "--interactions",
+        type=int,
+        default=20,
+        help="Mean interactions per contact (the distribution is skewed)",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", required=True, help="Database file to create")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if os.path.exists(args.output):
+        parser.error(f"{args.output} already exists")
+
+    contacts = parse_size(args.contacts)
+    generate_dataset(args.output, contacts, args.interactions, args.seed)
+
+
+if __name__ == "__main__":
+    main()
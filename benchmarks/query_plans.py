@@ -0,0 +1,287 @@
+"""Check that the hot pages and jobs only run indexed queries.
+
+    python -m benchmarks.query_plans --contacts small
+
+Runs each scenario against a copy of a generated dataset, records every
+statement it executes, and runs EXPLAIN QUERY PLAN on each one. Fails if a
+plan scans a whole table or sorts through a temp B-tree, unless the
+statement is listed in ALLOWED.
+"""
+
+import argparse
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from collections import namedtuple
+
+from sqlalchemy import event, func, select
+
+from app import create_app
+from app.models import ArchivedInteraction, Base, Interaction, InteractionRollup
+from app.services.archive_service import archive_history
+from app.services.scheduler_service import collect_reminder_digests
+from app.time_utils import curr_time
+from benchmarks import parse_size
+from benchmarks.dataset import ensure_dataset
+from benchmarks.run import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+Scenario = namedtuple("Scenario", ["name", "run"])
+
+ROLLUP_REFRESH = r"^SELECT anon_1.contact_id, count\(\*\) AS total_count"
+
+# Statements that may scan or sort, matched as regexes against their SQL
+ALLOWED = {
+    # Counting every contact reads the whole next_due_at index by design
+    "dashboard": [r"^SELECT count\(CASE WHEN"],
+    # Search ranks at most its result limit of FTS matches, in contacts and,
+    # when those run short, in interaction notes
+    "search": [r"FROM (contacts|interactions)_fts WHERE \1_fts MATCH"],
+    # Recomputing a rollup after a delete groups only the written contacts'
+    # interactions; new interactions are added to it in place
+    "delete interaction": [ROLLUP_REFRESH],
+    "bulk delete": [ROLLUP_REFRESH],
+    # Ageing the recent counts visits every rollup once a night
+    "archive": [r"^UPDATE interaction_rollups SET recent_count"],
+}
+
+# Archives another year of history on top of the configured horizon
+ARCHIVE_HORIZON_DAYS = 365
+
+SCANNED_STATEMENTS = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+
+class StatementRecorder:
+    """Collects the distinct statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.statements = {}
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(SCANNED_STATEMENTS):
+            params = parameters[0] if executemany else parameters
+            self.statements.setdefault(statement, params)
+
+    def take(self):
+        statements, self.statements = self.statements, {}
+        return statements
+
+
+def plan_problems(connection, statement, params, table_names):
+    """Return the plan lines showing a full table scan or a temp B-tree."""
+    plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", params)
+    problems = []
+    for row in plan:
+        detail = row[-1]
+        scan = re.match(r"SCAN (\w+)", detail)
+        if "TEMP B-TREE" in detail:
+            problems.append(detail)
+        elif scan and scan.group(1) in table_names and "USING" not in detail:
+            problems.append(detail)
+    return problems
+
+
+def htmx_headers(page):
+    """Headers HTMX sends with a request made from the given page."""
+    return {"HX-Request": "true", "HX-Current-URL": f"http://localhost{page}"}
+
+
+def build_scenarios(app):
+    """The hot pages and jobs, as zero-argument callables."""
+    client = app.test_client()
+    engine = app.db_engine
+    fragment_cache = app.extensions["fragment_cache"]
+
+    # Give the archive pages rows to show; the archive scenario moves more
+    archive_history(engine, app.config["INTERACTION_ARCHIVE_DAYS"])
+
+    with app.session_factory() as session:
+        # The contacts with the longest live and archived histories
+        busiest = session.execute(
+            select(InteractionRollup.contact_id)
+            .order_by(InteractionRollup.total_count.desc())
+            .limit(1)
+        ).scalar()
+        most_archived = session.execute(
+            select(ArchivedInteraction.contact_id)
+            .group_by(ArchivedInteraction.contact_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).scalar()
+        newest_ids = list(
+            session.execute(
+                select(Interaction.id).order_by(Interaction.id.desc()).limit(20)
+            ).scalars()
+        )
+        busiest_ids = list(
+            session.execute(
+                select(InteractionRollup.contact_id)
+                .order_by(InteractionRollup.total_count.desc())
+                .limit(5)
+            ).scalars()
+        )
+
+    def get(*paths):
+        def run():
+            fragment_cache.clear()
+            for path in paths:
+                response = client.get(path)
+                if response.status_code != 200:
+                    raise RuntimeError(f"GET {path} returned {response.status_code}")
+                # Follow infinite scroll and "load older" links once
+                next_url = re.search(rb'hx-get="([^"]*cursor=[^"]*)"', response.data)
+                if next_url:
+                    client.get(next_url.group(1).decode().replace("&amp;", "&"))
+
+        return run
+
+    # From the contact's page, so the responses carry its updates
+    detail_page = htmx_headers(f"/contacts/{busiest}")
+
+    def log_interaction():
+        form = {
+            "interaction_type": "call",
+            "interaction_date": curr_time().strftime("%Y-%m-%dT%H:%M"),
+            "notes": "Query plan check",
+        }
+        client.post(f"/interactions/add/{busiest}", data=form, headers=detail_page)
+
+    def delete_interaction():
+        with app.session_factory() as session:
+            interaction_id = session.execute(select(func.max(Interaction.id))).scalar()
+        client.delete(f"/interactions/delete/{interaction_id}", headers=detail_page)
+
+    def bulk_delete():
+        client.post(
+            "/interactions/delete",
+            data={"interaction_id": newest_ids},
+            headers=htmx_headers("/"),
+        )
+        client.post(
+            "/contacts/delete",
+            data={"contact_id": busiest_ids},
+            headers=htmx_headers("/contacts/"),
+        )
+
+    def reminders():
+        with app.session_factory() as session:
+            collect_reminder_digests(session, curr_time())
+
+    def archive():
+        archive_history(engine, ARCHIVE_HORIZON_DAYS)
+
+    return [
+        Scenario("dashboard", get("/", "/recent")),
+        Scenario(
+            "contact list",
+            get(
+                "/contacts/?sort=due",
+                "/contacts/?sort=name",
+                "/contacts/?filter=due",
+                "/contacts/?filter=overdue",
+            ),
+        ),
+        Scenario(
+            "contact detail",
+            get(
+                f"/contacts/{busiest}",
+                f"/contacts/{busiest}/detail",
+                f"/contacts/{busiest}/edit",
+                f"/contacts/{busiest}/stats",
+                f"/interactions/all/{busiest}",
+                f"/interactions/archive/{most_archived}",
+            ),
+        ),
+        Scenario("contact stats", get("/contacts/stats", "/contacts/stats?after=10")),
+        Scenario("search", get("/contacts/search?q=ada", "/contacts/search?q=coffee")),
+        Scenario("log interaction", log_interaction),
+        Scenario("delete interaction", delete_interaction),
+        Scenario("reminders", reminders),
+        Scenario("archive", archive),
+        Scenario("bulk delete", bulk_delete),
+    ]
+
+
+def check_scenario(scenario, recorder, engine, table_names):
+    """Run a scenario and return its problem statements with their plans."""
+    scenario.run()
+    allowed = ALLOWED.get(scenario.name, [])
+    failures = []
+    with engine.connect() as connection:
+        for statement, params in recorder.take().items():
+            flat = " ".join(statement.split())
+            if any(re.search(pattern, flat) for pattern in allowed):
+                continue
+            problems = plan_problems(connection, statement, params, table_names)
+            if problems:
+                failures.append((statement, problems))
+    return failures
+
+
+def check_query_plans(database):
+    """Run every scenario against a database, which they write to.
+
+    Returns each scenario's problem statements with their plans, by name.
+    """
+    app = create_app(
+        {
+            "DATABASE_URL": database,
+            "SCHEDULER_ENABLED": False,
+            "SERVER_NAME": os.environ.get("SERVER_NAME", "localhost"),
+        }
+    )
+    engine = app.db_engine
+    table_names = set(Base.metadata.tables)
+    scenarios = build_scenarios(app)
+    recorder = StatementRecorder(engine)
+    try:
+        return {
+            scenario.name: check_scenario(scenario, recorder, engine, table_names)
+            for scenario in scenarios
+        }
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check query plans of hot queries")
+    parser.add_argument(
+        "--contacts", default="small", help="small, medium, large or a number"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    contacts = parse_size(args.contacts)
+
+    logging.basicConfig(level=logging.WARNING)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    dataset = os.path.join(DATA_DIR, f"bench-{contacts}-{args.seed}.db")
+    ensure_dataset(dataset, contacts, args.seed)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # The scenarios write, so run them against a copy of the dataset
+        database = os.path.join(workdir, "query-plans.db")
+        with sqlite3.connect(dataset) as source, sqlite3.connect(database) as copy:
+            # Unlike a file copy, includes changes still in the WAL
+            source.backup(copy)
+        results = check_query_plans(database)
+
+    failed = False
+    for name, failures in results.items():
+        print(f"{name}: {'FAIL' if failures else 'ok'}")
+        for statement, problems in failures:
+            failed = True
+            print(f"  {' '.join(statement.split())}")
+            for problem in problems:
+                print(f"    {problem}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
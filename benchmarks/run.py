@@ -0,0 +1,259 @@
+"""Time the main pages and jobs against a generated dataset.
+
+    python -m benchmarks.run --contacts medium
+    python -m benchmarks.run --contacts medium --save-baseline
+
+Reports latency percentiles, SQL query counts and peak Python memory for
+each benchmark, and fails if results regress against the stored baseline.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+from sqlalchemy import event, func
+
+from app import create_app
+from app.models import Interaction
+from app.services.email_service import render_reminder_email
+from app.services.scheduler_service import collect_reminder_digests
+from app.time_utils import curr_time
+from benchmarks import parse_size
+from benchmarks.dataset import ensure_dataset
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCHMARK_DIR, "data")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Differences below these are noise rather than regressions
+LATENCY_NOISE_MS = 1.0
+MEMORY_NOISE_KIB = 64
+
+Benchmark = namedtuple("Benchmark", ["name", "run"])
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = round(pct / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def build_benchmarks(app):
+    """The pages and jobs to time, as zero-argument callables."""
+    client = app.test_client()
+    fragment_cache = app.extensions["fragment_cache"]
+
+    with app.session_factory() as session:
+        # The contact with the longest history is the worst case
+        busiest = (
+            session.query(Interaction.contact_id)
+            .group_by(Interaction.contact_id)
+            .order_by(func.count().desc())
+            .limit(1)
+            .scalar()
+        )
+        digests, _ = collect_reminder_digests(session, curr_time())
+
+    def page(path, uncached=False):
+        def run():
+            if uncached:
+                fragment_cache.clear()
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+        return run
+
+    def render_reminders():
+        with app.app_context():
+            render_reminder_email(digests)
+
+    return [
+        Benchmark("dashboard.index", page("/")),
+        Benchmark("contacts.list_contacts[all]", page("/contacts/?filter=all")),
+        Benchmark("contacts.list_contacts[due]", page("/contacts/?filter=due")),
+        Benchmark("contacts.list_contacts[overdue]", page("/contacts/?filter=overdue")),
+        Benchmark(
+            "interactions.get_interactions",
+            page(f"/interactions/all/{busiest}", uncached=True),
+        ),
+        Benchmark(
+            "SchedulerService.send_daily_reminders",
+            app.scheduler.send_daily_reminders,
+        ),
+        Benchmark("render_reminder_email", render_reminders),
+    ]
+
+
+def measure(benchmark, counter, iterations, warmup):
+    """Time a benchmark and record its query count and peak memory."""
+    for _ in range(warmup):
+        benchmark.run()
+
+    durations = []
+    queries = 0
+    for _ in range(iterations):
+        counter.count = 0
+        started = time.perf_counter()
+        benchmark.run()
+        durations.append((time.perf_counter() - started) * 1000)
+        queries = max(queries, counter.count)
+
+    # Separate pass, since tracing slows everything down
+    tracemalloc.start()
+    benchmark.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(durations, 50), 3),
+        "p95_ms": round(percentile(durations, 95), 3),
+        "p99_ms": round(percentile(durations, 99), 3),
+        "mean_ms": round(sum(durations) / len(durations), 3),
+        "queries": queries,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def find_regressions(results, baseline, tolerance):
+    """Compare results with a baseline, returning a message per regression."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if (
+            result["p95_ms"] > base["p95_ms"] * (1 + tolerance)
+            and result["p95_ms"] - base["p95_ms"] > LATENCY_NOISE_MS
+        ):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.2f}ms vs {base['p95_ms']:.2f}ms"
+            )
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{name}: {result['queries']} queries vs {base['queries']}"
+            )
+        if (
+            result["peak_kib"] > base["peak_kib"] * (1 + tolerance)
+            and result["peak_kib"] - base["peak_kib"] > MEMORY_NOISE_KIB
+        ):
+            regressions.append(
+                f"{name}: peak {result['peak_kib']:.0f}KiB "
+                f"vs {base['peak_kib']:.0f}KiB"
+            )
+    return regressions
+
+
+def print_results(results, baseline):
+    header = f"{'benchmark':<40} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'peak':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = (
+            f"{name:<40} {r['p50_ms']:>7.2f}ms {r['p95_ms']:>7.2f}ms "
+            f"{r['p99_ms']:>7.2f}ms {r['queries']:>8} {r['peak_kib']:>7.0f}KiB"
+        )
+        base = baseline.get(name)
+        if base:
+            change = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100
+            line += f"  (p95 {change:+.0f}% vs baseline)"
+        print(line)
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Round Again benchmarks")
+    parser.add_argument(
+        "--contacts", default="small", help="small, medium, large or a number"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--only", action="append", help="Run only benchmarks containing this text"
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the baseline for this dataset size",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown before a result counts as a regression",
+    )
+    args = parser.parse_args()
+    contacts = parse_size(args.contacts)
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    database = os.path.join(DATA_DIR, f"bench-{contacts}-{args.seed}.db")
+    ensure_dataset(database, contacts, args.seed)
+
+    app = create_app(
+        {
+            "DATABASE_URL": database,
+            "SCHEDULER_ENABLED": False,
+            "SERVER_NAME": os.environ.get("SERVER_NAME", "localhost"),
+        }
+    )
+
+    logging.getLogger().setLevel(logging.WARNING)
+    counter = QueryCounter(app.db_engine)
+
+    results = {}
+    for benchmark in build_benchmarks(app):
+        if args.only and not any(text in benchmark.name for text in args.only):
+            continue
+        results[benchmark.name] = measure(
+            benchmark, counter, args.iterations, args.warmup
+        )
+
+    baselines = load_baselines(args.baseline)
+    key = str(contacts)
+    baseline = baselines.get(key, {})
+    print(f"\n{contacts} contacts, {args.iterations} iterations\n")
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        baselines[key] = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    if baseline:
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# Script to export Round Again contacts or interaction history
+
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from app.models import init_db
+from app.services.export_service import EXPORTS, gzip_chunks
+
+
+def main():
+    """Stream contacts as CSV or interactions as NDJSON to a file or stdout"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Export Round Again data')
+    parser.add_argument('kind', choices=sorted(EXPORTS), help='What to export')
+    parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+    parser.add_argument('--since', type=datetime.fromisoformat,
+                        help='Only rows dated on or after this ISO date')
+    parser.add_argument('--until', type=datetime.fromisoformat,
+                        help='Only rows dated before this ISO date')
+    parser.add_argument('--contact-id', type=int, action='append', dest='contact_ids',
+                        help='Only this contact (can be repeated)')
+    parser.add_argument('--gzip', action='store_true', help='Gzip-compress the output')
+    args = parser.parse_args()
+
+    # Log to stderr so stdout only carries the export
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stderr,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    engine = init_db(os.environ.get('DATABASE_URL'))
+    export = EXPORTS[args.kind][0]
+    chunks = export(engine, since=args.since, until=args.until,
+                    contact_ids=args.contact_ids)
+
+    if args.gzip:
+        chunks = gzip_chunks(chunks)
+    else:
+        chunks = (chunk.encode('utf-8') for chunk in chunks)
+
+    output = open(args.output, 'wb') if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+if __name__ == "__main__":
+    main()
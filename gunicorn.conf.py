@@ -0,0 +1,56 @@
+# Production gunicorn settings for Round Again
+#
+# The app is built once in the master and workers are forked from it, so they
+# share its memory copy-on-write and start quickly. create_app() opens no
+# database connections and starts no threads; each worker drops any pooled
+# connections it inherited and starts its own scheduler after the fork.
+# Every setting can be overridden with an environment variable.
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+preload_app = True
+
+# Threaded workers, one per CPU: requests mostly wait on SQLite and SMTP, so a
+# few threads per process serve them without another copy of the app. Keep
+# threads within DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW.
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", os.cpu_count() or 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# Recycle workers now and then so slow leaks can't grow without bound; the
+# jitter keeps them from all restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Heartbeat files; /dev/shm avoids stalls on slow or overlay filesystems
+worker_tmp_dir = os.environ.get("GUNICORN_WORKER_TMP_DIR")
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    """Give the new worker its own connections and scheduler."""
+    from app import db
+
+    # Connections inherited from the master belong to it; don't close them
+    db.dispose_engines(close=False)
+
+    # The scheduler thread didn't survive the fork. Every worker runs one and
+    # the database lease picks which of them runs the jobs.
+    server.app.wsgi().scheduler.start()
+
+
+def worker_exit(server, worker):
+    """Hand the scheduler lease to another worker straight away."""
+    server.app.wsgi().scheduler.shutdown()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Script to bulk import contacts into Round Again from CSV or vCard files
+
+import argparse
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from app.models import init_db
+from app.services.import_service import (
+    IMPORT_BATCH_SIZE,
+    PARSERS,
+    detect_format,
+    import_contacts,
+)
+
+
+def main():
+    """Stream a CSV or vCard file into the contacts table"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description='Import contacts into Round Again')
+    parser.add_argument('path', help='CSV or vCard file to import')
+    parser.add_argument('--format', choices=sorted(PARSERS),
+                        help='File format (default: guessed from the extension)')
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                        help='Rows written per transaction')
+    args = parser.parse_args()
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    engine = init_db(os.environ.get('DATABASE_URL'))
+    fmt = args.format or detect_format(args.path)
+
+    logger.info(f"Importing {fmt} contacts from {args.path}...")
+    with open(args.path, encoding='utf-8-sig', newline='') as stream:
+        stats = import_contacts(engine, stream, fmt, batch_size=args.batch_size)
+
+    for line, message in stats.errors:
+        logger.warning(f"Line {line}: {message}")
+    if stats.error_count > len(stats.errors):
+        logger.warning(f"...and {stats.error_count - len(stats.errors)} more errors")
+
+    logger.info(f"Import complete: {stats}")
+    return stats.error_count == 0
+
+if __name__ == "__main__":
+    if not main():
+        sys.exit(1)
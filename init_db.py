@@ -4,12 +4,15 @@
 import logging
 import os
 
-from app.models import init_db, Base
-from sqlalchemy import create_engine
+from app.models import init_db
 from dotenv import load_dotenv
 
 def main():
-    """Initialize the database with schema"""
+    """Create or upgrade the database schema
+
+    The app no longer touches the schema on startup, so run this before
+    serving a new or upgraded database.
+    """
     load_dotenv()
 
     # Configure logging
@@ -21,14 +24,11 @@ def main():
 
     logger.info("Initializing database...")
 
-    # Initialize the database
+    # Create new tables, apply pending migrations and build the search index
     engine = init_db(os.environ.get('DATABASE_URL'))
 
-    # Create tables
-    Base.metadata.create_all(engine)
-
     logger.info("Database initialized successfully!")
-    logger.info("Tables created in round_again.db")
+    logger.info(f"Tables created in {engine.url.database}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# Script to rebuild the Round Again full-text search index
+
+import logging
+import os
+
+from dotenv import load_dotenv
+
+from app.models import init_db
+from app.search import rebuild_search_index
+
+
+def main():
+    """Reindex all contacts and interaction notes for search"""
+    load_dotenv()
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    logger.info("Rebuilding search index...")
+
+    # init_db creates the search tables and triggers if they are missing
+    engine = init_db(os.environ.get('DATABASE_URL'))
+    rebuild_search_index(engine)
+
+    logger.info("Search index rebuilt!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# Script to recompute or verify Round Again contact cadence statistics
+
+import argparse
+import logging
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from app.models import check_contact_stats, init_db, refresh_contact_stats
+
+
+def main():
+    """Recompute cadence statistics for every contact from full history"""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Recompute contact cadence stats")
+    parser.add_argument(
+        '--check',
+        action='store_true',
+        help="Only compare stored stats with a full recompute; exit 1 on drift",
+    )
+    args = parser.parse_args()
+
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    engine = init_db(os.environ.get('DATABASE_URL'))
+
+    if args.check:
+        logger.info("Checking contact stats...")
+        with engine.connect() as connection:
+            mismatched = check_contact_stats(connection)
+        if mismatched:
+            logger.error(
+                f"{len(mismatched)} contacts have stale stats, e.g. "
+                f"{', '.join(str(cid) for cid in mismatched[:10])}"
+            )
+            sys.exit(1)
+        logger.info("Contact stats are consistent!")
+        return
+
+    logger.info("Recomputing contact stats...")
+    with engine.begin() as connection:
+        written = refresh_contact_stats(connection)
+    logger.info(f"Stats recomputed for {written} contacts!")
+
+if __name__ == "__main__":
+    main()
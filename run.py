@@ -1,7 +1,17 @@
 import os
 import argparse
 import subprocess
-from app import app
+
+from dotenv import load_dotenv
+
+from app import create_app
+
+load_dotenv()
+
+app = create_app()
+
+# Importing this module starts nothing: gunicorn preloads it and forks workers,
+# and each worker starts its own scheduler (see gunicorn.conf.py)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -27,4 +37,12 @@ if __name__ == "__main__":
             stderr=subprocess.PIPE,
         )
 
+    # The development server creates or upgrades the schema itself
+    from app.models import init_db
+    init_db(app.config['DATABASE_URL'])
+
+    # This is the serving entry point, so run the scheduled jobs here; scripts
+    # that only build the app don't start them
+    app.scheduler.start()
+
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
\ No newline at end of file
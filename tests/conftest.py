@@ -0,0 +1,20 @@
+import pytest
+
+from app import create_app
+from app.models import init_db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Settings come from the environment; test the shipped defaults
+    monkeypatch.delenv("SERVER_NAME", raising=False)
+    database = str(tmp_path / "round_again.db")
+    init_db(database).dispose()
+    app = create_app({"DATABASE_URL": database, "SCHEDULER_ENABLED": False})
+    yield app
+    app.db_engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
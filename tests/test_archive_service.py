@@ -0,0 +1,63 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+
+from app.models import Contact, FrequencyUnit, Interaction, InteractionType
+from app.services.archive_service import archive_interactions
+from app.services.export_service import export_interactions_ndjson
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def add_interactions(engine, *ages_in_days):
+    with engine.begin() as connection:
+        return [
+            connection.execute(
+                insert(Interaction).values(
+                    contact_id=1,
+                    interaction_type=InteractionType.CALL,
+                    interaction_date=NOW - timedelta(days=age),
+                )
+            ).inserted_primary_key[0]
+            for age in ages_in_days
+        ]
+
+
+def exported(engine):
+    return [
+        json.loads(line)
+        for chunk in export_interactions_ndjson(engine)
+        for line in chunk.splitlines()
+    ]
+
+
+def test_archived_interactions_keep_their_ids(app):
+    engine = app.db_engine
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Contact).values(
+                id=1, name="Ada", frequency_value=1, frequency_unit=FrequencyUnit.WEEK
+            )
+        )
+    # The newest id is backdated, as imported history is
+    recent, old = add_interactions(engine, 1, 400)
+    before = {row["id"]: row["archived"] for row in exported(engine)}
+
+    assert archive_interactions(engine, 365, now=NOW) == 1
+    (logged,) = add_interactions(engine, 0)
+
+    # The archived id isn't handed out again
+    assert logged > old
+    after = exported(engine)
+    assert [(row["id"], row["archived"]) for row in after] == [
+        (recent, False),
+        (old, True),
+        (logged, False),
+    ]
+    assert before == {recent: False, old: False}
+    with engine.connect() as connection:
+        assert connection.execute(select(Interaction.id)).scalars().all() == [
+            recent,
+            logged,
+        ]
@@ -0,0 +1,10 @@
+from datetime import datetime, timedelta
+
+from app.cadence import compute_cadence
+
+
+def test_cadence_needs_a_positive_period():
+    dates = [datetime(2025, 1, 1) + timedelta(days=7 * i) for i in range(3)]
+
+    assert compute_cadence(dates, 0) is None
+    assert compute_cadence(dates, 7).on_time_count == 2
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Contact, FrequencyUnit
+
+
+def contact_form(**fields):
+    return {
+        "name": "Ada Lovelace",
+        "email": "ada@example.com",
+        "phone": "",
+        "frequency_value": "1",
+        "frequency_unit": FrequencyUnit.WEEK.value,
+        "notes": "",
+        **fields,
+    }
+
+
+def contact_count(app):
+    with app.session_factory() as session:
+        return session.execute(select(func.count(Contact.id))).scalar()
+
+
+@pytest.mark.parametrize("frequency_value", ["0", "-2"])
+def test_create_rejects_non_positive_frequency(app, client, frequency_value):
+    response = client.post(
+        "/contacts/create", data=contact_form(frequency_value=frequency_value)
+    )
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/contacts/new")
+    assert contact_count(app) == 0
+
+
+def test_update_rejects_non_positive_frequency(app, client):
+    client.post("/contacts/create", data=contact_form(frequency_value="3"))
+
+    response = client.post("/contacts/1/update", data=contact_form(frequency_value="0"))
+
+    assert response.headers["Location"].endswith("/contacts/1/edit")
+    with app.session_factory() as session:
+        assert session.get(Contact, 1).frequency_value == 3
+
+
+def test_bulk_delete_redirects_to_the_list(app, client):
+    for name in ("Ada", "Alan", "Grace"):
+        client.post("/contacts/create", data=contact_form(name=name))
+
+    response = client.post("/contacts/delete", data={"contact_id": ["1", "3"]})
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/contacts/")
+    assert contact_count(app) == 1
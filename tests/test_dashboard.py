@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.cache import cached_contact_counts
+from app.models import Contact, FrequencyUnit, bump_data_versions
+from app.view_models import ContactCounts
+
+NOW = datetime(2025, 6, 1, 9, 0)
+
+
+def test_contact_counts_are_cached_until_a_due_date_passes(app):
+    with app.db_engine.begin() as connection:
+        connection.execute(
+            insert(Contact),
+            [
+                {
+                    "name": name,
+                    "frequency_value": 1,
+                    "frequency_unit": FrequencyUnit.WEEK,
+                    "next_due_at": NOW + due_in,
+                }
+                for name, due_in in [
+                    ("Ada", timedelta(hours=3)),
+                    ("Grace", timedelta(days=7, hours=5)),
+                ]
+            ],
+        )
+
+    with app.app_context(), app.session_factory() as session:
+        counts = cached_contact_counts(session, NOW)
+        assert counts == ContactCounts(overdue=0, due_soon=1, total=2)
+        later = cached_contact_counts(session, NOW + timedelta(hours=2))
+        assert later is counts
+
+        # Ada is overdue, and Grace is due within the week
+        later = cached_contact_counts(session, NOW + timedelta(hours=6))
+        assert later == ContactCounts(overdue=1, due_soon=1, total=2)
+
+        bump_data_versions(session.connection())
+        assert cached_contact_counts(session, NOW + timedelta(hours=6)) is not later
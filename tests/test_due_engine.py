@@ -0,0 +1,75 @@
+"""due_engine.compute_due agrees with the original per-contact due formula."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.due_engine import DUE_SOON, ON_TRACK, OVERDUE, compute_due
+from app.models import FrequencyUnit
+
+NOW = datetime(2025, 6, 15, 12, 30)
+
+
+def baseline_next_due(last_interaction_at, frequency_value, frequency_unit):
+    """Contact.next_due_date as first written, from the latest interaction."""
+    if last_interaction_at is None:
+        return NOW
+    if frequency_unit == FrequencyUnit.DAY:
+        return last_interaction_at + timedelta(days=frequency_value)
+    if frequency_unit == FrequencyUnit.WEEK:
+        return last_interaction_at + timedelta(weeks=frequency_value)
+    if frequency_unit == FrequencyUnit.MONTH:
+        # Simple approximation for months (30 days)
+        return last_interaction_at + timedelta(days=30 * frequency_value)
+    return last_interaction_at + timedelta(days=365 * frequency_value)
+
+
+def baseline_status(days_until_due):
+    if days_until_due < 0:
+        return OVERDUE
+    if days_until_due <= 1:
+        return DUE_SOON
+    return ON_TRACK
+
+
+# How long ago the last interaction was, around every period's boundaries
+AGES = [
+    timedelta(0),
+    timedelta(hours=23),
+    timedelta(days=1, minutes=1),
+    timedelta(days=6, hours=12),
+    timedelta(days=13),
+    timedelta(days=29, hours=23),
+    timedelta(days=61),
+    timedelta(days=364),
+    timedelta(days=800),
+]
+
+
+@pytest.mark.parametrize("frequency_unit", list(FrequencyUnit))
+@pytest.mark.parametrize("frequency_value", [1, 2, 3, 6])
+@pytest.mark.parametrize("age", [*AGES, None], ids=str)
+def test_matches_baseline(frequency_unit, frequency_value, age):
+    last_interaction_at = None if age is None else NOW - age
+
+    batch = compute_due(
+        [(1, frequency_value, frequency_unit, last_interaction_at)], NOW
+    )
+
+    next_due = baseline_next_due(last_interaction_at, frequency_value, frequency_unit)
+    days = (next_due - NOW).days
+    assert batch.by_contact() == {1: (next_due, days, baseline_status(days))}
+
+
+def test_batch_keeps_row_order():
+    rows = [
+        (3, 1, FrequencyUnit.WEEK, NOW - timedelta(days=10)),
+        (1, 2, FrequencyUnit.MONTH, None),
+        (2, 1, FrequencyUnit.DAY, NOW - timedelta(hours=2)),
+    ]
+
+    batch = compute_due(rows, NOW)
+
+    assert batch.contact_ids == [3, 1, 2]
+    assert batch.status == [OVERDUE, DUE_SOON, DUE_SOON]
+    assert len(batch) == 3
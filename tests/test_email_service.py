@@ -0,0 +1,50 @@
+from sqlalchemy import insert, select
+
+from app.models import Contact, EmailOutbox, FrequencyUnit
+from app.services.email_service import render_reminder_email
+from app.services.scheduler_service import collect_reminder_digests
+from app.time_utils import curr_time
+
+
+def add_contact(app):
+    # Never contacted, so due today
+    with app.db_engine.begin() as connection:
+        connection.execute(
+            insert(Contact).values(
+                name="Ada Lovelace",
+                frequency_value=1,
+                frequency_unit=FrequencyUnit.WEEK,
+            )
+        )
+
+
+def render(app):
+    with app.app_context(), app.session_factory() as session:
+        digests, _ = collect_reminder_digests(session, curr_time())
+        return render_reminder_email(digests)[2]
+
+
+def test_reminder_email_renders_without_server_name(app):
+    add_contact(app)
+
+    html = render(app)
+
+    assert "Ada Lovelace" in html
+    assert "View Dashboard" not in html
+
+
+def test_reminder_email_links_dashboard_with_server_name(app):
+    app.config["SERVER_NAME"] = "round-again.example.com"
+    add_contact(app)
+
+    assert 'href="http://round-again.example.com/"' in render(app)
+
+
+def test_daily_reminder_job_queues_email_with_default_config(app):
+    add_contact(app)
+
+    app.scheduler.send_daily_reminders()
+
+    with app.session_factory() as session:
+        queued = session.execute(select(EmailOutbox.to_email)).scalars().all()
+    assert queued == [app.config["USER_EMAIL"]]
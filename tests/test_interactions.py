@@ -0,0 +1,82 @@
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.models import (
+    ArchivedInteraction,
+    Contact,
+    FrequencyUnit,
+    Interaction,
+    InteractionType,
+)
+
+ITEM = re.compile(r'<li id="((?:archived-)?interaction-\d+)"')
+MORE = re.compile(r'hx-get="([^"]+)"\s+hx-target="#archive-more"')
+
+
+def add_history(app, live_dates, archived_dates):
+    with app.db_engine.begin() as connection:
+        connection.execute(
+            insert(Contact).values(
+                id=1, name="Ada", frequency_value=1, frequency_unit=FrequencyUnit.WEEK
+            )
+        )
+        for model, dates in (
+            (Interaction, live_dates),
+            (ArchivedInteraction, archived_dates),
+        ):
+            if not dates:
+                continue
+            connection.execute(
+                insert(model),
+                [
+                    {
+                        "contact_id": 1,
+                        "interaction_type": InteractionType.CALL,
+                        "interaction_date": date,
+                    }
+                    for date in dates
+                ],
+            )
+
+
+def timeline(client, url):
+    """Every item of a history timeline, following its load-more links."""
+    items = []
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        items.extend(ITEM.findall(html))
+        more = MORE.search(html)
+        url = more and more.group(1).replace("&amp;", "&")
+    return items
+
+
+def test_history_pages_through_live_then_archived(app, client):
+    app.config["INTERACTIONS_PAGE_SIZE"] = 4
+    app.config["ARCHIVE_PAGE_SIZE"] = 3
+    day = datetime(2025, 6, 1, 9, 0)
+    # Ids 1-10, with pages splitting interactions logged at the same time
+    live_dates = [day + timedelta(days=i // 3) for i in range(10)]
+    add_history(app, live_dates, [day - timedelta(days=i) for i in range(1, 6)])
+
+    items = timeline(client, "/interactions/all/1")
+
+    assert items == [f"interaction-{i}" for i in range(10, 0, -1)] + [
+        f"archived-interaction-{i}" for i in range(1, 6)
+    ]
+
+
+def test_history_without_archive_ends_after_live_pages(app, client):
+    app.config["INTERACTIONS_PAGE_SIZE"] = 2
+    add_history(app, [datetime(2025, 6, 1) + timedelta(hours=i) for i in range(5)], [])
+
+    items = timeline(client, "/interactions/all/1")
+
+    assert items == [f"interaction-{i}" for i in range(5, 0, -1)]
+
+
+def test_history_rejects_invalid_cursor(app, client):
+    add_history(app, [datetime(2025, 6, 1)], [])
+
+    assert client.get("/interactions/all/1?cursor=nonsense").status_code == 400
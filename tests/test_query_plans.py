@@ -0,0 +1,31 @@
+"""Hot pages and jobs only run indexed queries (see benchmarks.query_plans)."""
+
+import pytest
+
+from benchmarks.dataset import generate_dataset
+from benchmarks.query_plans import check_query_plans
+
+# Enough history for every scenario to have rows to page, archive and delete
+CONTACTS = 200
+INTERACTIONS_PER_CONTACT = 10
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "query-plans.db")
+    generate_dataset(path, CONTACTS, INTERACTIONS_PER_CONTACT)
+    return path
+
+
+def test_hot_queries_use_indexes(database):
+    results = check_query_plans(database)
+
+    failures = {
+        name: [
+            f"{' '.join(statement.split())}: {'; '.join(problems)}"
+            for statement, problems in scenario_failures
+        ]
+        for name, scenario_failures in results.items()
+        if scenario_failures
+    }
+    assert not failures
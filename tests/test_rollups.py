@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from app.models import (
+    Contact,
+    FrequencyUnit,
+    Interaction,
+    InteractionRollup,
+    InteractionType,
+    refresh_rollups,
+)
+from app.time_utils import curr_time
+
+
+def stored_rollup(connection):
+    return connection.execute(select(InteractionRollup.__table__)).one()
+
+
+def test_rollups_match_a_full_refresh(app):
+    now = curr_time()
+    with app.session_factory() as session:
+        contact = Contact(
+            name="Ada", frequency_value=1, frequency_unit=FrequencyUnit.WEEK
+        )
+        session.add(contact)
+        session.commit()
+
+        def check():
+            connection = session.connection()
+            kept = stored_rollup(connection)
+            refresh_rollups(connection, [contact.id])
+            assert stored_rollup(connection) == kept
+            session.rollback()
+
+        for interaction_type, days_ago in [
+            (InteractionType.CALL, 200),
+            (InteractionType.EMAIL, 10),
+            # Same time as the last one, so the newer id is the latest
+            (InteractionType.TEXT, 10),
+            # Backdated
+            (InteractionType.VIDEO, 30),
+            (InteractionType.OTHER, 1),
+        ]:
+            interaction = Interaction(
+                contact=contact,
+                interaction_type=interaction_type,
+                interaction_date=now - timedelta(days=days_ago),
+            )
+            session.add(interaction)
+            session.commit()
+            check()
+
+        session.delete(interaction)
+        session.commit()
+        check()
+
+        rollup = stored_rollup(session.connection())
+        assert rollup.total_count == 4
+        assert rollup.last_interaction_type == InteractionType.TEXT
+        assert rollup.recent_count == 3
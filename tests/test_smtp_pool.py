@@ -0,0 +1,123 @@
+"""SMTPConnectionPool against a local aiosmtpd server."""
+
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+
+class RecordingHandler:
+    """Accepts every message except to rejected@, noting which connection sent it."""
+
+    def __init__(self):
+        self.delivered = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("rejected@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.append((envelope.rcpt_tos[0], session.peer))
+        return "250 OK"
+
+
+class SMTPServer:
+    """A local SMTP server that can be stopped and started on the same port."""
+
+    def __init__(self):
+        self.handler = RecordingHandler()
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.controller = None
+
+    def start(self):
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+
+    def stop(self):
+        if self.controller is not None:
+            self.controller.stop()
+            self.controller = None
+
+
+@pytest.fixture
+def smtp_server():
+    server = SMTPServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def pool(smtp_server):
+    pool = SMTPConnectionPool("127.0.0.1", smtp_server.port, use_tls=False)
+    yield pool
+    pool.close()
+
+
+def message(to_email):
+    message = EmailMessage()
+    message["From"] = "reminders@example.com"
+    message["To"] = to_email
+    message["Subject"] = "Time to reach out"
+    message.set_content("Say hello")
+    return message
+
+
+def test_reuses_connection_across_batches(pool, smtp_server):
+    pool.send_bulk([message("a@example.com"), message("b@example.com")])
+    pool.send_bulk([message("c@example.com")])
+
+    recipients = [to_email for to_email, _ in smtp_server.handler.delivered]
+    peers = {peer for _, peer in smtp_server.handler.delivered}
+    assert recipients == ["a@example.com", "b@example.com", "c@example.com"]
+    assert len(peers) == 1
+
+
+def test_rejected_recipient_fails_only_its_message(pool, smtp_server):
+    results = pool.send_bulk(
+        [
+            message("a@example.com"),
+            message("rejected@example.com"),
+            message("b@example.com"),
+        ]
+    )
+
+    assert [(r.to_email, r.sent) for r in results] == [
+        ("a@example.com", True),
+        ("rejected@example.com", False),
+        ("b@example.com", True),
+    ]
+    assert "No such user" in results[1].error
+    # The session survives the rejection
+    assert len({peer for _, peer in smtp_server.handler.delivered}) == 1
+
+
+def test_reconnects_after_server_restart(pool, smtp_server):
+    pool.send_bulk([message("a@example.com")])
+    smtp_server.stop()
+    smtp_server.start()
+
+    results = pool.send_bulk([message("b@example.com")])
+
+    assert [r.sent for r in results] == [True]
+    peers = [peer for _, peer in smtp_server.handler.delivered]
+    assert len(peers) == 2 and peers[0] != peers[1]
+
+
+def test_server_down_fails_every_message(pool, smtp_server):
+    smtp_server.stop()
+
+    results = pool.send_bulk([message("a@example.com"), message("b@example.com")])
+
+    assert [(r.to_email, r.sent) for r in results] == [
+        ("a@example.com", False),
+        ("b@example.com", False),
+    ]
+    assert all(r.error for r in results)